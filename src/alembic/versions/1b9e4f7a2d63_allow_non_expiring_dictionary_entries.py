@@ -0,0 +1,28 @@
+"""allow non expiring dictionary entries
+
+Revision ID: 1b9e4f7a2d63
+Revises: 0a6d3e8f5c21
+Create Date: 2025-03-17 09:33:51.604218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b9e4f7a2d63'
+down_revision: Union[str, None] = '0a6d3e8f5c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('dictionary_entry', 'expires_at', existing_type=sa.DateTime(timezone=True), nullable=True)
+
+
+def downgrade() -> None:
+    # Snapshot entries can be imported again with src/import_dictionary.py
+    op.execute('DELETE FROM dictionary_entry WHERE expires_at IS NULL')
+    op.alter_column('dictionary_entry', 'expires_at', existing_type=sa.DateTime(timezone=True), nullable=False)
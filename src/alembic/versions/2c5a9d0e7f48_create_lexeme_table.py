@@ -0,0 +1,107 @@
+"""create lexeme table
+
+Revision ID: 2c5a9d0e7f48
+Revises: 1b9e4f7a2d63
+Create Date: 2025-03-24 14:05:27.381906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c5a9d0e7f48'
+down_revision: Union[str, None] = '1b9e4f7a2d63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('lexeme',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('meaning', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('title')
+    )
+
+    # The shared meaning comes from the stored dictionary answer, a single word's translation may be
+    # a teacher's edit; titles without one take their most common translation
+    op.execute("""
+        INSERT INTO lexeme (title, meaning)
+        SELECT words.title, COALESCE(
+            CASE jsonb_typeof(dictionary_entry.payload -> 'shortdef')
+                WHEN 'array' THEN dictionary_entry.payload -> 'shortdef' ->> 0
+                WHEN 'string' THEN dictionary_entry.payload ->> 'shortdef'
+            END,
+            words.translation
+        )
+        FROM (
+            SELECT DISTINCT ON (lower(trim(title))) lower(trim(title)) AS title, translation
+            FROM word
+            GROUP BY lower(trim(title)), translation
+            ORDER BY lower(trim(title)), count(*) DESC, min(id)
+        ) AS words
+        LEFT JOIN dictionary_entry ON dictionary_entry.title = words.title
+    """)
+
+    op.add_column('word', sa.Column('lexeme_id', sa.Integer(), nullable=True))
+    op.execute("UPDATE word SET lexeme_id = lexeme.id FROM lexeme WHERE lexeme.title = lower(trim(word.title))")
+    op.alter_column('word', 'lexeme_id', existing_type=sa.Integer(), nullable=False)
+    op.create_foreign_key('word_lexeme_id_fkey', 'word', 'lexeme', ['lexeme_id'], ['id'])
+    op.create_index('ix_word_lexeme_id', 'word', ['lexeme_id'])
+
+    # Only translations that differ from the shared meaning are kept on the word
+    op.alter_column('word', 'translation', existing_type=sa.String(), nullable=True)
+    op.execute("""
+        UPDATE word SET translation = NULL
+        FROM lexeme
+        WHERE lexeme.id = word.lexeme_id AND word.translation = lexeme.meaning
+    """)
+
+    op.add_column('word_synonyms', sa.Column('lexeme_id', sa.Integer(), nullable=True))
+    op.execute("""
+        WITH representative AS (
+            SELECT DISTINCT ON (lexeme_id) id, lexeme_id
+            FROM word
+            ORDER BY lexeme_id, id
+        )
+        UPDATE word_synonyms SET lexeme_id = representative.lexeme_id
+        FROM representative
+        WHERE representative.id = word_synonyms.word_id
+    """)
+    op.execute("DELETE FROM word_synonyms WHERE lexeme_id IS NULL")
+    op.alter_column('word_synonyms', 'lexeme_id', existing_type=sa.Integer(), nullable=False)
+    op.create_foreign_key('word_synonyms_lexeme_id_fkey', 'word_synonyms', 'lexeme', ['lexeme_id'], ['id'])
+
+    op.drop_index('ix_word_synonyms_word_id_id', table_name='word_synonyms', if_exists=True)
+    op.drop_column('word_synonyms', 'word_id')
+    op.create_index('ix_word_synonyms_lexeme_id_id', 'word_synonyms', ['lexeme_id', 'id'])
+
+
+def downgrade() -> None:
+    op.add_column('word_synonyms', sa.Column('word_id', sa.Integer(), nullable=True))
+    op.execute("""
+        INSERT INTO word_synonyms (title, word_id)
+        SELECT word_synonyms.title, word.id
+        FROM word JOIN word_synonyms ON word_synonyms.lexeme_id = word.lexeme_id
+    """)
+    op.execute("DELETE FROM word_synonyms WHERE word_id IS NULL")
+    op.drop_index('ix_word_synonyms_lexeme_id_id', table_name='word_synonyms')
+    op.drop_column('word_synonyms', 'lexeme_id')
+    op.alter_column('word_synonyms', 'word_id', existing_type=sa.Integer(), nullable=False)
+    op.create_foreign_key('word_synonyms_word_id_fkey', 'word_synonyms', 'word', ['word_id'], ['id'])
+    op.create_index('ix_word_synonyms_word_id_id', 'word_synonyms', ['word_id', 'id'])
+
+    op.execute("""
+        UPDATE word SET translation = lexeme.meaning
+        FROM lexeme
+        WHERE lexeme.id = word.lexeme_id AND word.translation IS NULL
+    """)
+    op.alter_column('word', 'translation', existing_type=sa.String(), nullable=False)
+
+    op.drop_index('ix_word_lexeme_id', table_name='word')
+    op.drop_column('word', 'lexeme_id')
+    op.drop_table('lexeme')
@@ -0,0 +1,52 @@
+"""add search indexes
+
+Revision ID: 3e8b1c6f9a52
+Revises: 2c5a9d0e7f48
+Create Date: 2025-03-31 11:22:09.614873
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8b1c6f9a52'
+down_revision: Union[str, None] = '2c5a9d0e7f48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_lexeme_title_trgm', 'lexeme', ['title'],
+            postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_lexeme_meaning_tsv', 'lexeme', [sa.text("to_tsvector('english', meaning)")],
+            postgresql_using='gin',
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_word_synonyms_title_trgm', 'word_synonyms', ['title'],
+            postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True, if_not_exists=True
+        )
+        op.create_index(
+            'ix_word_translation_tsv', 'word', [sa.text("to_tsvector('english', translation)")],
+            postgresql_using='gin', postgresql_where=sa.text('translation IS NOT NULL'),
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_word_translation_tsv', table_name='word', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_word_synonyms_title_trgm', table_name='word_synonyms', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_lexeme_meaning_tsv', table_name='lexeme', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_lexeme_title_trgm', table_name='lexeme', postgresql_concurrently=True, if_exists=True)
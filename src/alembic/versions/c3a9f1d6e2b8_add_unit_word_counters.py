@@ -0,0 +1,48 @@
+"""add unit word counters
+
+Revision ID: c3a9f1d6e2b8
+Revises: b7d2e4f91a3c
+Create Date: 2025-02-10 17:42:05.230184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9f1d6e2b8'
+down_revision: Union[str, None] = 'b7d2e4f91a3c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('unit', sa.Column('words_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('unit', sa.Column('multipart_words_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('unit', sa.Column('distinct_titles_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_word_unit_id_title', 'word', ['unit_id', 'title'])
+
+    op.execute("""
+        UPDATE unit
+        SET words_count = stats.words_count,
+            multipart_words_count = stats.multipart_words_count,
+            distinct_titles_count = stats.distinct_titles_count
+        FROM (
+            SELECT unit_id,
+                   count(*) AS words_count,
+                   count(*) FILTER (WHERE strpos(title, '_') > 0) AS multipart_words_count,
+                   count(DISTINCT title) AS distinct_titles_count
+            FROM word
+            GROUP BY unit_id
+        ) AS stats
+        WHERE unit.id = stats.unit_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_word_unit_id_title', table_name='word')
+    op.drop_column('unit', 'distinct_titles_count')
+    op.drop_column('unit', 'multipart_words_count')
+    op.drop_column('unit', 'words_count')
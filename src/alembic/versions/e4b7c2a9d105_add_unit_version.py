@@ -0,0 +1,26 @@
+"""add unit version
+
+Revision ID: e4b7c2a9d105
+Revises: d81f0b5c7a94
+Create Date: 2025-02-24 12:18:40.517302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7c2a9d105'
+down_revision: Union[str, None] = 'd81f0b5c7a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('unit', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('unit', 'version')
@@ -0,0 +1,40 @@
+"""add hot path indexes
+
+Revision ID: f2c8a61e0b37
+Revises: e4b7c2a9d105
+Create Date: 2025-03-03 10:27:14.902651
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8a61e0b37'
+down_revision: Union[str, None] = 'e4b7c2a9d105'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('ix_word_unit_id_id', 'word', ['unit_id', 'id']),
+    ('ix_word_synonyms_word_id_id', 'word_synonyms', ['word_id', 'id']),
+    ('ix_unit_student_id_id', 'unit', ['student_id', 'id']),
+    ('ix_teacher_login', 'teacher', ['login']),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY does not lock writes but cannot run inside a transaction.
+    # IF NOT EXISTS lets the migration be rerun after an interrupted build; an invalid
+    # index left by such a build has to be dropped by hand first.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -5,8 +5,11 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from jwt import DecodeError
 
+from src.dependencies.auth_dependency import invalidate_current_user
+from src.external_systems.mail_outbox import mail_outbox
 from src.external_systems.unit_of_work import AsyncSqlAlchemyUnitOfWork
 from src.repository import auth as auth_repo
+from src.repository.mail import EmailOutboxRepository
 from src.schemas import auth as auth_schemas
 from src import utils
 from src.settings.db import get_async_session
@@ -27,8 +30,11 @@ async def register(
         created_teacher_id = await repository.create(body)
         teacher = await repository.get(created_teacher_id)
 
-    verification_token = utils.Token.encode_verification_token(teacher.login)
-    await utils.send_mail(body.email, verification_token)
+        verification_token = utils.Token.encode_verification_token(teacher.login)
+        subject, mail_body = utils.render_verification_mail(verification_token)
+        await EmailOutboxRepository(session).create(body.email, subject, mail_body)
+
+    mail_outbox.notify()
 
     return auth_schemas.UserResponseModel(
         login=teacher.login,
@@ -82,3 +88,5 @@ async def verify(
         repository = auth_repo.TeacherRepository(session)
         user = await repository.get_by_login(user_login)
         await repository.update(user.id, {'is_active': True})
+
+    invalidate_current_user(user.id)
@@ -1,17 +1,24 @@
+import typing as t
+
 import fastapi
 from fastapi import UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import JSONResponse
 
-from src.dependencies.auth_dependency import get_current_user
+from src.dependencies.auth_dependency import get_current_user, invalidate_current_user
 from src.external_systems.unit_of_work import AsyncSqlAlchemyUnitOfWork
-from src.models import Teacher
 from src.settings.db import get_async_session
 from src.repository import lesson as lesson_repo
 from src.schemas import lesson as lesson_schema
+from src.schemas.auth import CurrentTeacher
 from src.repository import auth as auth_repo
+from src.repository import upload as upload_repo
+from src.external_systems.synonym_graph import synonym_graph
+from src.external_systems.upload_jobs import upload_jobs
 from src.settings.settings import Config
-from src.utils import UnitParams, CsvFileManager, OxfordApi
+from src.utils import (
+    CsvFileManager, Lexicon, OxfordApi, UnitWordsImporter, UnitWordsCounter, UnitWordsListCache, ListingResponse
+)
 
 lessons_router = fastapi.APIRouter(
     prefix='/lessons',
@@ -42,18 +49,18 @@ async def create_student(
     response_model=list[lesson_schema.StudentForListingResponse]
 )
 async def get_students(
+    query: t.Annotated[lesson_schema.StudentListQuery, fastapi.Query()],
     session: AsyncSession = fastapi.Depends(get_async_session),
 ) -> list[lesson_schema.StudentForListingResponse]:
     async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
 
     async with async_unit_of_work:
         repository = lesson_repo.StudentRepository(session)
-        students = await repository.list()
+        students = await repository.list(**query.model_dump())
 
-    return [
-        lesson_schema.StudentForListingResponse(
-            login=student.login, id=student.id, fio=student.fio) for student in students
-    ]
+    return ListingResponse.build(lesson_schema.StudentForListingResponse, [
+        {'login': student.login, 'id': student.id, 'fio': student.fio} for student in students
+    ])
 
 
 @lessons_router.patch(
@@ -73,12 +80,62 @@ async def update_student_profile(
         await repository.update(student_id, body.model_dump())
 
 
+@lessons_router.get(
+    '/students/{student_id}/overview',
+    status_code=fastapi.status.HTTP_200_OK,
+    response_model=lesson_schema.StudentOverviewResponse
+)
+async def get_student_overview(
+    student_id: int = fastapi.Path(...),
+    session: AsyncSession = fastapi.Depends(get_async_session),
+) -> lesson_schema.StudentOverviewResponse:
+    async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
+
+    async with async_unit_of_work:
+        repository = lesson_repo.StudentRepository(session)
+        student = await repository.get_overview(student_id)
+
+    if not student:
+        return JSONResponse(
+            status_code=fastapi.status.HTTP_404_NOT_FOUND,
+            content={'details': 'Студент не найден'}
+        )
+
+    return lesson_schema.StudentOverviewResponse(
+        id=student.id,
+        fio=student.fio,
+        login=student.login,
+        units=[
+            lesson_schema.UnitOverviewResponse(
+                id=unit.id,
+                name=unit.name,
+                gaaginx_idx=unit.gaaging_idx,
+                diversity_idx=unit.diversity_idx,
+                words=[
+                    lesson_schema.WordOverviewResponse(
+                        id=word.id,
+                        title=word.title,
+                        translation=word.meaning,
+                        topic=word.topic,
+                        is_completed=word.completed,
+                        synonyms=[
+                            lesson_schema.WordSynonymsSchema(id=synonym.id, title=synonym.title)
+                            for synonym in word.lexeme.synonyms
+                        ]
+                    ) for word in unit.words
+                ]
+            ) for unit in student.units
+        ]
+    )
+
+
 @lessons_router.get(
     '/students/{student_id}/units',
     status_code=fastapi.status.HTTP_200_OK,
     response_model=list[lesson_schema.UnitForListingResponse]
 )
 async def get_units_by_student(
+    query: t.Annotated[lesson_schema.UnitListQuery, fastapi.Query()],
     student_id: int = fastapi.Path(...),
     session: AsyncSession = fastapi.Depends(get_async_session),
 ) -> list[lesson_schema.UnitForListingResponse]:
@@ -86,13 +143,12 @@ async def get_units_by_student(
 
     async with async_unit_of_work:
         repository = lesson_repo.UnitRepository(session)
-        units = await repository.list(student_id=student_id)
+        units = await repository.list(student_id=student_id, **query.model_dump())
 
-    return [
-        lesson_schema.UnitForListingResponse(
-            id=unit.id, name=unit.name, gaaginx_idx=unit.gaaging_idx
-        ) for unit in units
-    ]
+    return ListingResponse.build(lesson_schema.UnitForListingResponse, [
+        {'id': unit.id, 'name': unit.name, 'gaaginx_idx': unit.gaaging_idx, 'diversity_idx': unit.diversity_idx}
+        for unit in units
+    ])
 
 @lessons_router.post(
     '/students/{student_id}/units',
@@ -144,6 +200,8 @@ async def update_teacher_profile(
         repository = auth_repo.TeacherRepository(session)
         await repository.update(teacher_id, body.model_dump())
 
+    invalidate_current_user(teacher_id)
+
 
 @lessons_router.get(
     '/units/{unit_id}/words',
@@ -151,24 +209,30 @@ async def update_teacher_profile(
     response_model=list[lesson_schema.WordForListingResponse]
 )
 async def get_words_by_unit(
+    query: t.Annotated[lesson_schema.WordListQuery, fastapi.Query()],
     unit_id: int = fastapi.Path(...),
+    if_none_match: str | None = fastapi.Header(None),
     session: AsyncSession = fastapi.Depends(get_async_session),
-) -> list[lesson_schema.WordForListingResponse]:
+) -> fastapi.Response:
     async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
 
     async with async_unit_of_work:
-        repository = lesson_repo.WordRepository(session)
-        words = await repository.list(unit_id=unit_id)
-
-    return [
-        lesson_schema.WordForListingResponse(
-            id=word.id,
-            title=word.title,
-            translation=word.translation,
-            topic=word.topic,
-            is_completed=word.completed
-        ) for word in words
-    ]
+        # The version is read before the words, so a cached body is never older than its ETag
+        version = await lesson_repo.UnitRepository(session).get_version(unit_id)
+        etag = UnitWordsListCache.etag(unit_id, version or 0, query.model_dump())
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+        if version is not None and UnitWordsListCache.etag_matches(if_none_match, etag):
+            return fastapi.Response(status_code=fastapi.status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        body = UnitWordsListCache.get(etag) if version is not None else None
+
+        if body is None:
+            repository = lesson_repo.WordRepository(session)
+            words = await repository.list(unit_id=unit_id, **query.model_dump())
+            body = UnitWordsListCache.set(etag, words)
+
+    return fastapi.Response(content=body, media_type='application/json', headers=headers)
 
 @lessons_router.post(
     '/units/{unit_id}/words',
@@ -179,37 +243,26 @@ async def create_new_word_into_unit(
     body: lesson_schema.CreateUnitWordRequest,
     unit_id: int = fastapi.Path(...),
     session: AsyncSession = fastapi.Depends(get_async_session),
-    user: Teacher = fastapi.Depends(get_current_user)
+    user: CurrentTeacher = fastapi.Depends(get_current_user)
 ):
     async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
 
-    word_meta = await OxfordApi.parse_word_from_api(body.title)
+    lookup = await Lexicon.lookup([body.title])
 
-    if not word_meta:
+    if not lookup.is_found(body.title):
         return JSONResponse(
             status_code=fastapi.status.HTTP_404_NOT_FOUND,
             content={'details': 'Слово не найден'}
         )
 
-    word_meaning = OxfordApi.get_meaning(word_meta)
-    word_synonyms = OxfordApi.get_synonyms(word_meta)
-
     async with async_unit_of_work:
-        repository = lesson_repo.WordRepository(session)
-
-        word_id = await repository.create(body, word_meaning, unit_id)
-        unit_words = await repository.list(unit_id)
-        gaaging_idx = UnitParams.calculate_gag_index(unit_words)
-        diversity_idx = UnitParams.calculate_diversity_index(unit_words)
+        lexeme_ids = await Lexicon.save(session, lookup)
 
-        repository = lesson_repo.WordSynonymRepository(session)
-        await repository.bulk_create(word_synonyms, word_id)
+        repository = lesson_repo.WordRepository(session)
+        await repository.create(body, lexeme_ids[OxfordApi.normalize_title(body.title)], unit_id)
 
-        repository = lesson_repo.UnitRepository(session)
-        await repository.update(
-            unit_id,
-            {'gaaging_idx': gaaging_idx, 'diversity_idx': diversity_idx}
-        )
+        await UnitWordsCounter.apply(session, unit_id, added=[body.title])
+        await lesson_repo.UnitRepository(session).bump_version(unit_id)
 
 
 @lessons_router.patch(
@@ -224,22 +277,40 @@ async def update_unit_word(
     word_id: int = fastapi.Path(...),
 ) -> None:
     async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
+    values = body.model_dump()
 
-    async with async_unit_of_work:
-        repository = lesson_repo.WordRepository(session)
-        await repository.update(word_id, body.model_dump())
+    # A new title points the word at the lexeme of that title
+    if body.title is not None:
+        lookup = await Lexicon.lookup([body.title])
+
+        if not lookup.is_found(body.title):
+            return JSONResponse(
+                status_code=fastapi.status.HTTP_404_NOT_FOUND,
+                content={'details': 'Слово не найден'}
+            )
 
     async with async_unit_of_work:
         repository = lesson_repo.WordRepository(session)
-        unit_words = await repository.list(unit_id)
-        gaaging_idx = UnitParams.calculate_gag_index(unit_words)
-        diversity_idx = UnitParams.calculate_diversity_index(unit_words)
+        word = await repository.get(word_id)
 
-        repository = lesson_repo.UnitRepository(session)
-        await repository.update(
-            unit_id,
-            {'gaaging_idx': gaaging_idx, 'diversity_idx': diversity_idx}
-        )
+        # The counters of the path unit are adjusted, so the word has to belong to it
+        if word is None or word.unit_id != unit_id:
+            return JSONResponse(
+                status_code=fastapi.status.HTTP_404_NOT_FOUND,
+                content={'details': 'Слово не найден'}
+            )
+
+        if body.title is not None:
+            lexeme_ids = await Lexicon.save(session, lookup)
+            values['lexeme_id'] = lexeme_ids[OxfordApi.normalize_title(body.title)]
+
+        previous_title = word.title
+        await repository.update(word_id, values, unit_id)
+
+        if body.title is not None:
+            await UnitWordsCounter.apply(session, unit_id, added=[body.title], removed=[previous_title])
+
+        await lesson_repo.UnitRepository(session).bump_version(unit_id)
 
 
 @lessons_router.delete(
@@ -256,52 +327,203 @@ async def delete_unit_word(
 
     async with async_unit_of_work:
         repository = lesson_repo.WordRepository(session)
-        await repository.delete(word_id)
+        word = await repository.get(word_id)
+
+        if word is None or word.unit_id != unit_id:
+            return JSONResponse(
+                status_code=fastapi.status.HTTP_404_NOT_FOUND,
+                content={'details': 'Слово не найден'}
+            )
+
+        await repository.delete(word_id, unit_id)
+        await UnitWordsCounter.apply(session, unit_id, removed=[word.title])
+        await lesson_repo.UnitRepository(session).bump_version(unit_id)
+
+
+@lessons_router.patch(
+    '/units/{unit_id}/words',
+    status_code=fastapi.status.HTTP_200_OK,
+    response_model=lesson_schema.BulkUnitWordsResponse
+)
+async def bulk_update_unit_words(
+    body: lesson_schema.BulkUpdateUnitWordsRequest,
+    unit_id: int = fastapi.Path(...),
+    session: AsyncSession = fastapi.Depends(get_async_session),
+) -> lesson_schema.BulkUnitWordsResponse:
+    async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
+    changes = {word.id: word.model_dump() for word in body.words}
+    titles = [change['title'] for change in changes.values() if change['title'] is not None]
+
+    if titles:
+        lookup = await Lexicon.lookup(titles)
+
+        if not all(lookup.is_found(title) for title in titles):
+            return JSONResponse(
+                status_code=fastapi.status.HTTP_404_NOT_FOUND,
+                content={'details': 'Слово не найден'}
+            )
+
+    async with async_unit_of_work:
+        if titles:
+            lexeme_ids = await Lexicon.save(session, lookup)
+            for change in changes.values():
+                if change['title'] is not None:
+                    change['lexeme_id'] = lexeme_ids[OxfordApi.normalize_title(change['title'])]
+
+        word_ids = await lesson_repo.WordRepository(session).bulk_update(unit_id, list(changes.values()))
+
+        if word_ids:
+            # Completion and translation do not take part in the unit indices
+            if titles:
+                await UnitWordsCounter.recalculate(session, [unit_id])
+            await lesson_repo.UnitRepository(session).bump_version(unit_id)
+
+    return lesson_schema.BulkUnitWordsResponse(word_ids=word_ids)
+
+
+@lessons_router.delete(
+    '/units/{unit_id}/words',
+    status_code=fastapi.status.HTTP_200_OK,
+    response_model=lesson_schema.BulkUnitWordsResponse
+)
+async def bulk_delete_unit_words(
+    query: t.Annotated[lesson_schema.BulkDeleteUnitWordsQuery, fastapi.Query()],
+    unit_id: int = fastapi.Path(...),
+    session: AsyncSession = fastapi.Depends(get_async_session),
+) -> lesson_schema.BulkUnitWordsResponse:
+    async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
+
+    async with async_unit_of_work:
+        word_ids = await lesson_repo.WordRepository(session).bulk_delete(unit_id, query.word_ids)
+
+        if word_ids:
+            await UnitWordsCounter.recalculate(session, [unit_id])
+            await lesson_repo.UnitRepository(session).bump_version(unit_id)
+
+    return lesson_schema.BulkUnitWordsResponse(word_ids=word_ids)
 
 @lessons_router.post(
-    'units/{unit_id}/words/upload',
+    '/units/{unit_id}/words/upload',
     status_code=fastapi.status.HTTP_201_CREATED,
-    response_model=None
+    response_model=lesson_schema.UploadUnitWordsResponse
 )
 async def upload_unit_words(
     unit_id: int = fastapi.Path(...),
     session: AsyncSession = fastapi.Depends(get_async_session),
     file: UploadFile = fastapi.File(...)
-) -> None:
+) -> lesson_schema.UploadUnitWordsResponse:
+    summary = lesson_schema.UploadUnitWordsResponse()
+    batch = []
+
+    async def import_batch() -> None:
+        not_found = await UnitWordsImporter.import_batch(session, unit_id, batch)
+        summary.created += len(batch) - len(not_found)
+        summary.not_found += len(not_found)
+        batch.clear()
+
+    async for row in CsvFileManager.stream(file):
+        if isinstance(row, lesson_schema.CsvRowError):
+            summary.failed += 1
+            if len(summary.errors) < Config.CSV_UPLOAD_MAX_ERRORS:
+                summary.errors.append(row)
+            continue
+
+        batch.append(row)
+        if len(batch) >= Config.CSV_UPLOAD_BATCH_SIZE:
+            await import_batch()
+
+    if batch:
+        await import_batch()
+
+    return summary
+
+@lessons_router.post(
+    '/units/{unit_id}/words/upload-jobs',
+    status_code=fastapi.status.HTTP_202_ACCEPTED,
+    response_model=lesson_schema.UploadJobCreatedResponse
+)
+async def create_upload_job(
+    unit_id: int = fastapi.Path(...),
+    session: AsyncSession = fastapi.Depends(get_async_session),
+    file: UploadFile = fastapi.File(...)
+) -> lesson_schema.UploadJobCreatedResponse:
     async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
 
-    contents = await file.read()
-    contents = contents.decode("utf-8")
-    list_of_words = CsvFileManager.read(contents)
+    async with async_unit_of_work:
+        if await lesson_repo.UnitRepository(session).get_version(unit_id) is None:
+            return JSONResponse(
+                status_code=fastapi.status.HTTP_404_NOT_FOUND,
+                content={'details': 'Раздел не найден'}
+            )
 
-    for one_word in list_of_words:
-        async with async_unit_of_work:
-            word_meta = await OxfordApi.parse_word_from_api(one_word.title)
+        repository = upload_repo.UploadJobRepository(session)
+        job = await repository.create(unit_id, file.filename, await file.read())
 
-            if word_meta:
-                word_meaning = OxfordApi.get_meaning(word_meta)
-                word_synonyms = OxfordApi.get_synonyms(word_meta)
+    upload_jobs.notify()
 
-                word_repo = lesson_repo.WordRepository(session)
-                word_id = await word_repo.create(one_word, word_translation=word_meaning, unit_id=unit_id)
+    return lesson_schema.UploadJobCreatedResponse(id=job.id, status=job.status)
 
-                word_synonyms_repo = lesson_repo.WordSynonymRepository(session)
-                await word_synonyms_repo.bulk_create(word_synonyms, word_id)
 
+@lessons_router.get(
+    '/upload-jobs/{job_id}',
+    status_code=fastapi.status.HTTP_200_OK,
+    response_model=lesson_schema.UploadJobResponse
+)
+async def get_upload_job(
+    job_id: int = fastapi.Path(...),
+    session: AsyncSession = fastapi.Depends(get_async_session),
+) -> lesson_schema.UploadJobResponse:
+    async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
 
     async with async_unit_of_work:
+        repository = upload_repo.UploadJobRepository(session)
+        job = await repository.get(job_id)
+
+    if not job:
+        return JSONResponse(
+            status_code=fastapi.status.HTTP_404_NOT_FOUND,
+            content={'details': 'Задача загрузки не найдена'}
+        )
 
+    return lesson_schema.UploadJobResponse(
+        id=job.id,
+        unit_id=job.unit_id,
+        status=job.status,
+        processed_rows=job.processed_rows,
+        created=job.created,
+        not_found=job.not_found,
+        failed=job.failed,
+        errors=job.errors,
+        last_error=job.last_error
+    )
+
+@lessons_router.get(
+    '/words/search',
+    status_code=fastapi.status.HTTP_200_OK,
+    response_model=list[lesson_schema.WordSearchResponse]
+)
+async def search_words(
+    query: t.Annotated[lesson_schema.WordSearchQuery, fastapi.Query()],
+    session: AsyncSession = fastapi.Depends(get_async_session),
+) -> list[lesson_schema.WordSearchResponse]:
+    async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
+
+    async with async_unit_of_work:
         repository = lesson_repo.WordRepository(session)
-        unit_words = await repository.list(unit_id)
+        matches = await repository.search(**query.model_dump())
 
-        gaaging_idx = UnitParams.calculate_gag_index(unit_words)
-        diversity_idx = UnitParams.calculate_diversity_index(unit_words)
+    return ListingResponse.build(lesson_schema.WordSearchResponse, [
+        {
+            'id': word.id,
+            'unit_id': word.unit_id,
+            'title': word.title,
+            'translation': word.meaning,
+            'topic': word.topic,
+            'is_completed': word.completed,
+            'rank': rank
+        } for word, rank in matches
+    ])
 
-        repository = lesson_repo.UnitRepository(session)
-        await repository.update(
-            unit_id,
-            {'gaaging_idx': gaaging_idx, 'diversity_idx': diversity_idx}
-        )
 
 @lessons_router.get(
     '/words/{word_id}/synonyms',
@@ -309,6 +531,7 @@ async def upload_unit_words(
     response_model=list[lesson_schema.WordSynonymsSchema]
 )
 async def get_word_synonyms(
+    query: t.Annotated[lesson_schema.PaginationQuery, fastapi.Query()],
     word_id: int = fastapi.Path(...),
     session: AsyncSession = fastapi.Depends(get_async_session),
 ) -> list[lesson_schema.WordSynonymsSchema]:
@@ -316,10 +539,76 @@ async def get_word_synonyms(
     repository = lesson_repo.WordSynonymRepository(session)
 
     async with async_unit_of_work:
-        word_synonyms = await repository.list(word_id=word_id)
+        word_synonyms = await repository.list(word_id=word_id, **query.model_dump())
+
+    return ListingResponse.build(lesson_schema.WordSynonymsSchema, [
+        {'id': synonym.id, 'title': synonym.title} for synonym in word_synonyms
+    ])
+
+@lessons_router.get(
+    '/words/{word_id}/related',
+    status_code=fastapi.status.HTTP_200_OK,
+    response_model=list[lesson_schema.RelatedWordResponse]
+)
+async def get_related_words(
+    query: t.Annotated[lesson_schema.RelatedWordsQuery, fastapi.Query()],
+    word_id: int = fastapi.Path(...),
+    session: AsyncSession = fastapi.Depends(get_async_session),
+) -> list[lesson_schema.RelatedWordResponse]:
+    if not synonym_graph.ready:
+        return JSONResponse(
+            status_code=fastapi.status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={'details': 'Граф синонимов еще загружается'}
+        )
+
+    async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
+
+    async with async_unit_of_work:
+        word = await lesson_repo.WordRepository(session).get(word_id)
+
+        if not word:
+            return JSONResponse(
+                status_code=fastapi.status.HTTP_404_NOT_FOUND,
+                content={'details': 'Слово не найден'}
+            )
+
+        # The lexeme may come from another process and not be in this graph yet
+        await synonym_graph.ensure_lexemes(session, [word.lexeme_id])
+
+    return ListingResponse.build(lesson_schema.RelatedWordResponse, [
+        {'title': title, 'hops': hops}
+        for title, hops in synonym_graph.related(word.lexeme_id, query.hops, query.limit)
+    ])
+
+
+@lessons_router.get(
+    '/units/{unit_id}/shared-synonyms',
+    status_code=fastapi.status.HTTP_200_OK,
+    response_model=list[lesson_schema.SharedSynonymsResponse]
+)
+async def get_unit_shared_synonyms(
+    unit_id: int = fastapi.Path(...),
+    session: AsyncSession = fastapi.Depends(get_async_session),
+) -> list[lesson_schema.SharedSynonymsResponse]:
+    if not synonym_graph.ready:
+        return JSONResponse(
+            status_code=fastapi.status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={'details': 'Граф синонимов еще загружается'}
+        )
+
+    async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
 
-    return [
-        lesson_schema.WordSynonymsSchema(id=synonym.id, title=synonym.title)
-        for synonym
-        in word_synonyms
-    ]
\ No newline at end of file
+    async with async_unit_of_work:
+        if await lesson_repo.UnitRepository(session).get_version(unit_id) is None:
+            return JSONResponse(
+                status_code=fastapi.status.HTTP_404_NOT_FOUND,
+                content={'details': 'Раздел не найден'}
+            )
+
+        words = await lesson_repo.WordRepository(session).list_lexeme_ids(unit_id)
+        await synonym_graph.ensure_lexemes(session, {lexeme_id for _, lexeme_id in words})
+
+    return ListingResponse.build(lesson_schema.SharedSynonymsResponse, [
+        {'synonym': synonym, 'word_ids': word_ids}
+        for synonym, word_ids in synonym_graph.shared_synonyms(words)
+    ])
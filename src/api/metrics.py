@@ -0,0 +1,15 @@
+import fastapi
+from fastapi.responses import PlainTextResponse
+
+from src.metrics import render_prometheus
+
+metrics_router = fastapi.APIRouter(tags=['metrics'])
+
+
+@metrics_router.get(
+    '/metrics',
+    status_code=fastapi.status.HTTP_200_OK,
+    response_class=PlainTextResponse
+)
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_prometheus(), media_type='text/plain; version=0.0.4')
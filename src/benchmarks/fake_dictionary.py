@@ -0,0 +1,64 @@
+"""Local stand-in for the vocabulary API with configurable latency and failures.
+
+Every title is known unless it is picked for a not-found or an error answer.
+Answers have the shape OxfordApi expects: a list whose first element holds
+`meta.syns` and `shortdef`.
+
+    python -m src.benchmarks.fake_dictionary --port 8100 --latency 0.2 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+
+import fastapi
+import uvicorn
+
+
+def create_app(
+    latency: float = 0.1,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    not_found_rate: float = 0.0,
+    synonyms: int = 5
+) -> fastapi.FastAPI:
+    app = fastapi.FastAPI()
+
+    @app.get('/{title}')
+    async def get_word(title: str):
+        await asyncio.sleep(max(0.0, random.gauss(latency, jitter)))
+
+        chance = random.random()
+        if chance < error_rate:
+            return fastapi.responses.JSONResponse(status_code=503, content={'detail': 'unavailable'})
+
+        if chance < error_rate + not_found_rate:
+            return [f'{title}s', f'{title}ing']
+
+        return [{
+            'meta': {
+                'id': title,
+                'syns': [[f'{title}_synonym_{number}' for number in range(synonyms)]],
+            },
+            'shortdef': [f'meaning of {title}'],
+        }]
+
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8100)
+    parser.add_argument('--latency', type=float, default=0.1, help='mean answer delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.02, help='standard deviation of the delay')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of 503 answers')
+    parser.add_argument('--not-found-rate', type=float, default=0.0, help='share of unknown words')
+    parser.add_argument('--synonyms', type=int, default=5, help='synonyms per word')
+    args = parser.parse_args()
+
+    uvicorn.run(
+        create_app(args.latency, args.jitter, args.error_rate, args.not_found_rate, args.synonyms),
+        host=args.host,
+        port=args.port,
+        log_level='warning'
+    )
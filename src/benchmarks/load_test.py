@@ -0,0 +1,200 @@
+"""Load test of the API against a local database and a fake vocabulary API.
+
+The database comes from the usual DB_* variables, for example the `db`
+service of docker-compose with migrations applied. Vocabulary lookups go to
+src.benchmarks.fake_dictionary, started in the same process, and mail is
+dropped by the noop mail backend. By default the application runs in-process;
+with --base-url requests go to an already running server instead, which
+must be configured with the same database and ENGLISH_VOCABULAR_URL.
+
+    python -m src.benchmarks.load_test --requests 200 --concurrency 20 --json before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+import httpx
+import uvicorn
+
+from src.benchmarks import fake_dictionary
+from src.benchmarks.report import summarize, print_report
+
+SCENARIOS = ('create_word', 'upload', 'list_words', 'login')
+PASSWORD = 'benchmark-password'
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    # Config reads the environment on import, so this runs before any src module is loaded
+    os.environ['ENGLISH_VOCABULAR_URL'] = f'http://127.0.0.1:{args.dictionary_port}'
+    os.environ.setdefault('ENGLISH_VOCABULAR_API_KEY', 'benchmark')
+    os.environ['MAIL_BACKEND'] = 'noop'
+    os.environ.setdefault('SERVER_MAIL_USERNAME', 'benchmark@example.com')
+    os.environ.setdefault('SERVER_MAIL_PASSWORD', 'benchmark')
+
+
+async def seed(client: httpx.AsyncClient) -> dict:
+    import sqlalchemy as sa
+
+    from src import models
+    from src.external_systems.unit_of_work import AsyncSqlAlchemyUnitOfWork
+    from src.settings.db import get_async_session
+
+    login = f'benchmark-{uuid.uuid4().hex[:12]}'
+    response = await client.post('/auth/register', json={
+        'email': f'{login}@example.com',
+        'login': login,
+        'fio': 'Benchmark',
+        'password': PASSWORD,
+        'confirm_password': PASSWORD,
+    })
+    response.raise_for_status()
+
+    response = await client.post('/auth/login', data={'username': login, 'password': PASSWORD})
+    response.raise_for_status()
+
+    session = get_async_session()
+    async with AsyncSqlAlchemyUnitOfWork(session):
+        student_id = (await session.execute(
+            sa.insert(models.Student).values(login=login, fio='Benchmark', is_active=True).returning(models.Student.id)
+        )).scalar_one()
+        unit_id = (await session.execute(
+            sa.insert(models.Unit).values(name=login, student_id=student_id).returning(models.Unit.id)
+        )).scalar_one()
+
+    return {
+        'login': login,
+        'headers': {'Authorization': f'Bearer {response.json()["access_token"]}'},
+        'student_id': student_id,
+        'unit_id': unit_id,
+    }
+
+
+def make_scenario(name: str, client: httpx.AsyncClient, context: dict, args: argparse.Namespace):
+    def random_word() -> str:
+        return f'word{random.randrange(args.vocabulary_size)}'
+
+    async def create_word(_: int) -> httpx.Response:
+        return await client.post(
+            f'/lessons/units/{context["unit_id"]}/words',
+            json={'title': random_word(), 'topic': 'benchmark'},
+            headers=context['headers']
+        )
+
+    async def upload(_: int) -> httpx.Response:
+        rows = '\n'.join(f'{random_word()},benchmark' for _ in range(args.upload_rows))
+        return await client.post(
+            f'/lessons/units/{context["unit_id"]}/words/upload',
+            files={'file': ('words.csv', f'Term,Category\n{rows}\n'.encode(), 'text/csv')},
+            headers=context['headers']
+        )
+
+    async def list_words(_: int) -> httpx.Response:
+        return await client.get(
+            f'/lessons/units/{context["unit_id"]}/words',
+            params={'limit': 100},
+            headers=context['headers']
+        )
+
+    async def login(_: int) -> httpx.Response:
+        return await client.post('/auth/login', data={'username': context['login'], 'password': PASSWORD})
+
+    return {
+        'create_word': create_word,
+        'upload': upload,
+        'list_words': list_words,
+        'login': login,
+    }[name]
+
+
+async def run_scenario(make_request, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def send(number: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started_at = time.perf_counter()
+            try:
+                response = await make_request(number)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started_at)
+            errors += failed
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(send(number) for number in range(requests)))
+
+    return {**summarize(latencies, time.perf_counter() - started_at), 'errors': errors}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from src.main import app
+    from src.settings.db import AsyncPostgreSQLEngine
+
+    dictionary = uvicorn.Server(uvicorn.Config(
+        fake_dictionary.create_app(
+            latency=args.dictionary_latency,
+            jitter=args.dictionary_jitter,
+            error_rate=args.dictionary_error_rate,
+            not_found_rate=args.dictionary_not_found_rate
+        ),
+        host='127.0.0.1',
+        port=args.dictionary_port,
+        log_level='warning'
+    ))
+    dictionary_task = asyncio.create_task(dictionary.serve())
+    while not dictionary.started:
+        await asyncio.sleep(0.05)
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://app', timeout=args.timeout)
+
+    results = {}
+    try:
+        async with app.router.lifespan_context(app), client:
+            context = await seed(client)
+
+            for name in args.scenario or SCENARIOS:
+                scenario = make_scenario(name, client, context, args)
+                requests = args.upload_requests if name == 'upload' else args.requests
+                results[name] = await run_scenario(scenario, requests, args.concurrency)
+                print_report(name, results[name])
+    finally:
+        dictionary.should_exit = True
+        await dictionary_task
+        await AsyncPostgreSQLEngine.dispose()
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='may be repeated, all by default')
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--upload-requests', type=int, default=10)
+    parser.add_argument('--upload-rows', type=int, default=20, help='words per uploaded file')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--vocabulary-size', type=int, default=500, help='distinct words to pick from')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--base-url', default=None, help='test a running server instead of an in-process app')
+    parser.add_argument('--dictionary-port', type=int, default=8100)
+    parser.add_argument('--dictionary-latency', type=float, default=0.1)
+    parser.add_argument('--dictionary-jitter', type=float, default=0.02)
+    parser.add_argument('--dictionary-error-rate', type=float, default=0.0)
+    parser.add_argument('--dictionary-not-found-rate', type=float, default=0.0)
+    parser.add_argument('--json', default=None, help='write the results to this file')
+    args = parser.parse_args()
+
+    configure_environment(args)
+    results = asyncio.run(run(args))
+
+    if args.json:
+        with open(args.json, 'w') as report_file:
+            json.dump({'arguments': vars(args), 'results': results}, report_file, indent=2)
@@ -0,0 +1,136 @@
+"""Shows how a burst of logins affects the latency of unrelated requests.
+
+A teacher is registered and then logged in through POST /auth/login many
+times, while a probe keeps requesting a cheap endpoint of the same
+application. The burst runs twice: once with the bcrypt hash verified on the
+event loop, the way it was done before hashing moved to the password
+executor, and once as the application does it now.
+
+The database comes from the usual DB_* variables, as for load_test.
+
+    python -m src.benchmarks.login_burst --logins 100 --concurrency 20
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+import uuid
+from unittest import mock
+
+import httpx
+
+from src.benchmarks.report import summarize, print_report
+
+PASSWORD = 'benchmark-password'
+PROBE_INTERVAL = 0.005
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list[float]) -> None:
+    # Latency is counted from the moment the request was due, so time spent
+    # waiting for a blocked event loop is included.
+    while not stop.is_set():
+        due_at = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        await client.get('/openapi.json')
+        latencies.append(time.perf_counter() - due_at)
+
+
+async def register(client: httpx.AsyncClient) -> str:
+    login = f'benchmark-{uuid.uuid4().hex[:12]}'
+    response = await client.post('/auth/register', json={
+        'email': f'{login}@example.com',
+        'login': login,
+        'fio': 'Benchmark',
+        'password': PASSWORD,
+        'confirm_password': PASSWORD,
+    })
+    response.raise_for_status()
+    return login
+
+
+async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+    from src.utils import pwd_context
+
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+async def run_probe(client: httpx.AsyncClient, duration: float) -> dict:
+    stop, latencies = asyncio.Event(), []
+    started_at = time.perf_counter()
+
+    task = asyncio.create_task(probe(client, stop, latencies))
+    await asyncio.sleep(duration)
+    stop.set()
+    await task
+
+    return summarize(latencies, time.perf_counter() - started_at)
+
+
+async def run_burst(
+    client: httpx.AsyncClient,
+    login: str,
+    logins: int,
+    concurrency: int
+) -> tuple[dict, dict]:
+    semaphore = asyncio.Semaphore(concurrency)
+    stop, probe_latencies, login_latencies = asyncio.Event(), [], []
+    errors = 0
+
+    async def send_login() -> None:
+        nonlocal errors
+        async with semaphore:
+            started_at = time.perf_counter()
+            response = await client.post('/auth/login', data={'username': login, 'password': PASSWORD})
+            login_latencies.append(time.perf_counter() - started_at)
+            errors += response.status_code >= 400
+
+    started_at = time.perf_counter()
+    probe_task = asyncio.create_task(probe(client, stop, probe_latencies))
+    await asyncio.gather(*(send_login() for _ in range(logins)))
+    stop.set()
+    await probe_task
+    elapsed = time.perf_counter() - started_at
+
+    return {**summarize(login_latencies, elapsed), 'errors': errors}, summarize(probe_latencies, elapsed)
+
+
+async def main(args: argparse.Namespace) -> None:
+    from src.main import app
+    from src.settings.db import AsyncPostgreSQLEngine
+    from src.utils import Password
+
+    transport = httpx.ASGITransport(app=app)
+
+    try:
+        async with app.router.lifespan_context(app), \
+                httpx.AsyncClient(transport=transport, base_url='http://benchmark', timeout=60.0) as client:
+            login = await register(client)
+            await client.get('/openapi.json')
+            print_report('probe, idle', await run_probe(client, args.idle_seconds))
+
+            for inline in (True, False):
+                mode = 'event loop' if inline else 'password executor'
+                verification = mock.patch.object(Password, 'verify_password', verify_inline) if inline else contextlib.nullcontext()
+                with verification:
+                    logins, probe_during_burst = await run_burst(client, login, args.logins, args.concurrency)
+                print_report(f'logins, {mode}', logins)
+                print_report(f'probe during logins, {mode}', probe_during_burst)
+    finally:
+        await AsyncPostgreSQLEngine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--idle-seconds', type=float, default=1.0)
+
+    args = parser.parse_args()
+
+    # Config reads the environment on import, registration mail is dropped
+    os.environ['MAIL_BACKEND'] = 'noop'
+    os.environ.setdefault('SERVER_MAIL_USERNAME', 'benchmark@example.com')
+    os.environ.setdefault('SERVER_MAIL_PASSWORD', 'benchmark')
+
+    asyncio.run(main(args))
@@ -0,0 +1,25 @@
+import statistics
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict:
+    # quantiles needs two points, a single latency is repeated for it and not counted twice
+    samples = latencies if len(latencies) >= 2 else (latencies * 2 or [0.0, 0.0])
+    percentiles = statistics.quantiles(samples, n=100, method='inclusive')
+
+    return {
+        'requests': len(latencies),
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': percentiles[49],
+        'p95': percentiles[94],
+        'p99': percentiles[98],
+        'max': max(samples),
+    }
+
+
+def print_report(name: str, summary: dict) -> None:
+    print(
+        f'{name:<40} {summary["requests"]:>7} req {summary["throughput"]:>9.1f} req/s   '
+        f'p50 {summary["p50"] * 1000:>8.2f} ms   p95 {summary["p95"] * 1000:>8.2f} ms   '
+        f'p99 {summary["p99"] * 1000:>8.2f} ms   max {summary["max"] * 1000:>8.2f} ms'
+        + (f'   errors {summary["errors"]}' if 'errors' in summary else '')
+    )
@@ -0,0 +1,110 @@
+"""Compares the ways a large word list can be turned into a response body.
+
+`schemas` is the default path of the listing endpoints: a Pydantic model per
+row, validated and serialized again by FastAPI through response_model and
+rendered by JSONResponse. `orjson` is the FAST_JSON_RESPONSES path, plain
+dicts rendered by ORJSONResponse. `type_adapter` is how the word list cache
+serializes bodies when the fast mode is off.
+
+    python -m src.benchmarks.serialization --words 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import pydantic
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from src.schemas.lesson import WordForListingResponse
+
+
+def make_words(count: int) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            id=number,
+            title=f'word number {number}',
+            translation=f'a rather long dictionary meaning of the word number {number}',
+            topic='benchmark' if number % 2 else None,
+            completed=bool(number % 3)
+        ) for number in range(count)
+    ]
+
+
+def word_rows(words: list[SimpleNamespace]) -> list[dict]:
+    return [
+        {
+            'id': word.id,
+            'title': word.title,
+            'translation': word.translation,
+            'topic': word.topic,
+            'is_completed': word.completed
+        } for word in words
+    ]
+
+
+async def render_with_schemas(words: list[SimpleNamespace]) -> bytes:
+    content = [
+        WordForListingResponse(
+            id=word.id,
+            title=word.title,
+            translation=word.translation,
+            topic=word.topic,
+            is_completed=word.completed
+        ) for word in words
+    ]
+    field = create_model_field(name='response', type_=list[WordForListingResponse], mode='serialization')
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+async def render_with_orjson(words: list[SimpleNamespace]) -> bytes:
+    return ORJSONResponse(word_rows(words)).body
+
+
+async def render_with_type_adapter(words: list[SimpleNamespace]) -> bytes:
+    adapter = pydantic.TypeAdapter(list[WordForListingResponse])
+    return adapter.dump_json(adapter.validate_python(word_rows(words)))
+
+
+RENDERERS = {
+    'schemas': render_with_schemas,
+    'orjson': render_with_orjson,
+    'type_adapter': render_with_type_adapter,
+}
+
+
+async def measure(render, words: list[SimpleNamespace], repeat: int) -> dict:
+    durations = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        body = await render(words)
+        durations.append(time.perf_counter() - started_at)
+
+    tracemalloc.start()
+    await render(words)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'median': statistics.median(durations), 'min': min(durations), 'peak': peak, 'size': len(body)}
+
+
+async def main(args: argparse.Namespace) -> None:
+    words = make_words(args.words)
+
+    for name, render in RENDERERS.items():
+        result = await measure(render, words, args.repeat)
+        print(
+            f'{name:<40} median {result["median"] * 1000:>9.2f} ms   min {result["min"] * 1000:>9.2f} ms   '
+            f'peak memory {result["peak"] / 2 ** 20:>7.2f} MiB   body {result["size"] / 2 ** 20:>6.2f} MiB'
+        )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--words', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,266 @@
+"""Fails when a hot repository query falls back to a sequential scan.
+
+Seeds a large dataset inside a transaction that is rolled back at the end, so
+it can be pointed at any migrated database, runs ANALYZE, calls the
+repository methods and runs EXPLAIN on every statement they sent. A statement
+executed with many parameter sets is explained with the first one.
+
+Not checked: the single-row INSERTs of the create methods, which have no
+scan to choose, and UnitRepository.word_stats without unit ids, which counts
+every word on purpose.
+
+    python -m src.check_query_plans --units 20000 --words-per-unit 25
+"""
+import argparse
+import asyncio
+import json
+import sys
+import typing as t
+from datetime import datetime, timezone
+
+import sqlalchemy as sa
+import sqlalchemy.ext.asyncio as sa_io
+
+from src.repository import auth as auth_repo
+from src.repository import dictionary as dictionary_repo
+from src.repository import lesson as lesson_repo
+from src.repository import mail as mail_repo
+from src.repository import upload as upload_repo
+from src.settings.db import AsyncPostgreSQLEngine
+
+SEED_PREFIX = 'plan-check'
+
+SEED_STATEMENTS = (
+    """
+    INSERT INTO teacher (fio, login, email, password, is_active)
+    SELECT 'Teacher ' || n, '{prefix}-' || n, '{prefix}-' || n || '@example.com', '', true
+    FROM generate_series(1, :teachers) AS n
+    """,
+    """
+    INSERT INTO student (login, fio, is_active)
+    SELECT '{prefix}-' || n, 'Student ' || n, n % 10 <> 0
+    FROM generate_series(1, :students) AS n
+    """,
+    """
+    INSERT INTO unit (name, student_id)
+    SELECT 'Unit ' || n, student.id
+    FROM student, generate_series(1, :units_per_student) AS n
+    WHERE student.login LIKE '{prefix}-%'
+    """,
+    """
+    INSERT INTO lexeme (title, meaning)
+    SELECT '{prefix} word ' || n, 'meaning'
+    FROM generate_series(0, :vocabulary - 1) AS n
+    """,
+    """
+    INSERT INTO word (title, unit_id, lexeme_id, topic, completed)
+    SELECT lexeme.title, unit.id, lexeme.id, 'topic ' || n % 10, n % 3 = 0
+    FROM unit JOIN student ON student.id = unit.student_id, generate_series(1, :words_per_unit) AS n, lexeme
+    WHERE student.login LIKE '{prefix}-%'
+        AND lexeme.title = '{prefix} word ' || (unit.id * :words_per_unit + n) % :vocabulary
+    """,
+    """
+    INSERT INTO word_synonyms (title, lexeme_id)
+    SELECT lexeme.title || ' synonym ' || n, lexeme.id
+    FROM lexeme, generate_series(1, :synonyms_per_word) AS n
+    WHERE lexeme.title LIKE '{prefix} word %'
+    """,
+    """
+    INSERT INTO dictionary_entry (title, payload, expires_at)
+    SELECT '{prefix} word ' || n, '{{}}'::jsonb, now() + interval '1 day'
+    FROM generate_series(0, :vocabulary - 1) AS n
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO upload_job (unit_id, filename, content, status)
+    SELECT unit.id, 'words.csv', '', CASE WHEN unit.id % 100 = 0 THEN 'queued' ELSE 'done' END
+    FROM unit JOIN student ON student.id = unit.student_id
+    WHERE student.login LIKE '{prefix}-%'
+    """,
+    """
+    INSERT INTO email_outbox (recipient, subject, body, status)
+    SELECT '{prefix}-' || n || '@example.com', 'subject', 'body', CASE WHEN n % 100 = 0 THEN 'queued' ELSE 'sent' END
+    FROM generate_series(1, :teachers) AS n
+    """,
+)
+
+ANALYZED_TABLES = (
+    'teacher', 'student', 'unit', 'lexeme', 'word', 'word_synonyms', 'dictionary_entry', 'upload_job', 'email_outbox'
+)
+
+
+async def seed(connection: sa_io.AsyncConnection, args: argparse.Namespace) -> dict:
+    units_per_student = max(1, args.units // args.students)
+    parameters = {
+        'teachers': args.teachers,
+        'students': args.students,
+        'units_per_student': units_per_student,
+        'words_per_unit': args.words_per_unit,
+        'synonyms_per_word': args.synonyms_per_word,
+        'vocabulary': args.vocabulary,
+    }
+
+    for statement in SEED_STATEMENTS:
+        await connection.execute(sa.text(statement.format(prefix=SEED_PREFIX)), parameters)
+        print('.', end='', flush=True)
+
+    for table in ANALYZED_TABLES:
+        await connection.exec_driver_sql(f'ANALYZE {table}')
+    print(' seeded', flush=True)
+
+    # Ids from the middle of the seeded data, so neither end of an index is favoured
+    student_id, unit_id, word_id, lexeme_id, synonym_id, upload_job_id = (await connection.execute(sa.text(f"""
+        SELECT student.id, unit.id, word.id, word.lexeme_id, word_synonyms.id, upload_job.id
+        FROM student JOIN unit ON unit.student_id = student.id JOIN word ON word.unit_id = unit.id
+            JOIN word_synonyms ON word_synonyms.lexeme_id = word.lexeme_id
+            JOIN upload_job ON upload_job.unit_id = unit.id
+        WHERE student.login = '{SEED_PREFIX}-{args.students // 2}'
+        ORDER BY unit.id, word.id
+        LIMIT 1
+    """))).one()
+
+    return {
+        'student_id': student_id,
+        'unit_id': unit_id,
+        'word_id': word_id,
+        'lexeme_id': lexeme_id,
+        'synonym_id': synonym_id,
+        'upload_job_id': upload_job_id,
+        'teacher_login': f'{SEED_PREFIX}-{args.teachers // 2}',
+        'title': f'{SEED_PREFIX} word {args.vocabulary // 2}',
+        'titles': [f'{SEED_PREFIX} word {n}' for n in range(args.vocabulary // 2, args.vocabulary // 2 + 20)],
+    }
+
+
+def hot_queries(session: sa_io.AsyncSession, ids: dict) -> dict[str, t.Callable[[], t.Awaitable]]:
+    students = lesson_repo.StudentRepository(session)
+    units = lesson_repo.UnitRepository(session)
+    words = lesson_repo.WordRepository(session)
+    synonyms = lesson_repo.WordSynonymRepository(session)
+    lexemes = lesson_repo.LexemeRepository(session)
+    teachers = auth_repo.TeacherRepository(session)
+    dictionary = dictionary_repo.DictionaryEntryRepository(session)
+    outbox = mail_repo.EmailOutboxRepository(session)
+    uploads = upload_repo.UploadJobRepository(session)
+    now = datetime.now(timezone.utc)
+
+    return {
+        'StudentRepository.list': lambda: students.list(is_active=True, after_id=ids['student_id'], limit=100),
+        'StudentRepository.get_overview': lambda: students.get_overview(ids['student_id']),
+        'UnitRepository.list': lambda: units.list(student_id=ids['student_id'], limit=100),
+        'UnitRepository.get_version': lambda: units.get_version(ids['unit_id']),
+        'UnitRepository.word_stats': lambda: units.word_stats([ids['unit_id']]),
+        'UnitRepository.list_ids': lambda: units.list_ids(after_id=ids['unit_id'], limit=1000),
+        'UnitRepository.lock': lambda: units.lock([ids['unit_id']]),
+        'UnitRepository.update_word_counters': lambda: units.update_word_counters(ids['unit_id'], words=1),
+        'UnitRepository.bulk_update': lambda: units.bulk_update([{'id': ids['unit_id'], 'words_count': 0}]),
+        'WordRepository.list': lambda: words.list(unit_id=ids['unit_id'], limit=100),
+        'WordRepository.get': lambda: words.get(ids['word_id']),
+        'WordRepository.search': lambda: words.search('word 1234', student_id=ids['student_id'], limit=20),
+        'WordRepository.search, short query': lambda: words.search('wo', student_id=ids['student_id'], limit=20),
+        'WordRepository.search, other case': lambda: words.search('WORD 1234', student_id=ids['student_id'], limit=20),
+        'WordRepository.list_lexeme_ids': lambda: words.list_lexeme_ids(ids['unit_id']),
+        'WordRepository.count_titles': lambda: words.count_titles(ids['unit_id'], [ids['title']]),
+        'LexemeRepository.get_ids': lambda: lexemes.get_ids([ids['title']]),
+        'LexemeRepository.create_many': lambda: lexemes.create_many([
+            {'title': title, 'meaning': 'meaning', 'synonyms': [f'{title} synonym']}
+            for title in [ids['title'], f'{SEED_PREFIX} new word']
+        ]),
+        'LexemeRepository.list_titles': lambda: lexemes.list_titles(after_id=ids['lexeme_id'], limit=1000),
+        'LexemeRepository.get_titles': lambda: lexemes.get_titles([ids['lexeme_id']]),
+        'WordSynonymRepository.list_for_lexemes': lambda: synonyms.list_for_lexemes([ids['lexeme_id']]),
+        'WordSynonymRepository.list_edges': lambda: synonyms.list_edges(after_id=ids['synonym_id'], limit=1000),
+        'WordSynonymRepository.list': lambda: synonyms.list(word_id=ids['word_id'], limit=100),
+        'TeacherRepository.get_by_login': lambda: teachers.get_by_login(ids['teacher_login']),
+        'DictionaryEntryRepository.get_many': lambda: dictionary.get_many(ids['titles']),
+        'DictionaryEntryRepository.create_many': lambda: dictionary.create_many([
+            {'title': title, 'payload': {}, 'ttl': 60} for title in ids['titles']
+        ]),
+        'DictionaryEntryRepository.bulk_import': lambda: dictionary.bulk_import([
+            {'title': title, 'payload': {}} for title in ids['titles']
+        ]),
+        'UploadJobRepository.get': lambda: uploads.get(ids['upload_job_id']),
+        'UploadJobRepository.claim': lambda: uploads.claim('plan-check', now),
+        'UploadJobRepository.update_progress': lambda: uploads.update_progress(ids['upload_job_id'], 'plan-check', {}),
+        'EmailOutboxRepository.claim_due': lambda: outbox.claim_due(50, now),
+        'EmailOutboxRepository.mark_sent': lambda: outbox.mark_sent([1, 2, 3]),
+        'EmailOutboxRepository.mark_failed_attempt': lambda: outbox.mark_failed_attempt(1, 'error', now),
+        'WordRepository.bulk_create': lambda: words.bulk_create([
+            {'title': ids['title'], 'unit_id': ids['unit_id'], 'lexeme_id': ids['lexeme_id'], 'topic': 'topic'}
+        ] * 2),
+        'WordRepository.bulk_update': lambda: words.bulk_update(ids['unit_id'], [{'id': ids['word_id'], 'completed': True}]),
+        # Run last, the word is gone afterwards; the transaction is rolled back anyway
+        'WordRepository.bulk_delete': lambda: words.bulk_delete(ids['unit_id'], [ids['word_id']]),
+        'WordRepository.delete': lambda: words.delete(ids['word_id']),
+    }
+
+
+def sequential_scans(plan: dict) -> t.Iterator[str]:
+    if plan['Node Type'] == 'Seq Scan':
+        yield plan['Relation Name']
+
+    for child in plan.get('Plans', ()):
+        yield from sequential_scans(child)
+
+
+async def check_query_plans(args: argparse.Namespace) -> bool:
+    captured: list[tuple[str, t.Any]] = []
+    capturing = False
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if capturing:
+            captured.append((statement, parameters[0] if executemany else parameters))
+
+    async with AsyncPostgreSQLEngine.connect() as connection:
+        transaction = await connection.begin()
+        sa.event.listen(connection.sync_connection, 'before_cursor_execute', capture)
+
+        try:
+            ids = await seed(connection, args)
+            session = sa_io.AsyncSession(bind=connection, join_transaction_mode='create_savepoint')
+            passed = True
+
+            for name, query in hot_queries(session, ids).items():
+                captured.clear()
+                capturing = True
+                await query()
+                capturing = False
+
+                scanned = set()
+                for statement, parameters in list(captured):
+                    if statement.lstrip().upper().startswith(('SAVEPOINT', 'RELEASE')):
+                        continue
+
+                    result = await connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters)
+                    plan = result.scalar_one()
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    scanned.update(sequential_scans(plan[0]['Plan']))
+
+                passed &= not scanned
+                print(f'{name:<40} {"seq scan on " + ", ".join(sorted(scanned)) if scanned else "ok"}')
+
+            await session.close()
+        finally:
+            await transaction.rollback()
+
+    return passed
+
+
+async def main(args: argparse.Namespace) -> int:
+    try:
+        return 0 if await check_query_plans(args) else 1
+    finally:
+        await AsyncPostgreSQLEngine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check that hot repository queries use indexes')
+    parser.add_argument('--teachers', type=int, default=10000)
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--units', type=int, default=20000)
+    parser.add_argument('--words-per-unit', type=int, default=25)
+    parser.add_argument('--synonyms-per-word', type=int, default=3, help='synonyms per seeded lexeme')
+    parser.add_argument('--vocabulary', type=int, default=20000, help='distinct seeded word titles')
+
+    sys.exit(asyncio.run(main(parser.parse_args())))
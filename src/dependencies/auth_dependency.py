@@ -7,10 +7,11 @@ from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.external_systems.unit_of_work import AsyncSqlAlchemyUnitOfWork
-from src.models import Teacher
 from src.repository import auth as auth_repo
+from src.schemas.auth import CurrentTeacher
 from src.settings.db import get_async_session
 from src.settings.settings import Config
+from src.utils import TTLCache
 
 
 class TokenData(BaseModel):
@@ -18,12 +19,20 @@ class TokenData(BaseModel):
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+current_user_cache = TTLCache(Config.CURRENT_USER_CACHE_SIZE, Config.CURRENT_USER_CACHE_TTL)
+
+
+def invalidate_current_user(teacher_id: int) -> None:
+    for login, teacher in current_user_cache.items():
+        if teacher.id == teacher_id:
+            current_user_cache.pop(login)
+
 
 async def get_current_user(
     request: fastapi.Request,
     token: t.Annotated[str, fastapi.Depends(oauth2_scheme)],
     session: AsyncSession = fastapi.Depends(get_async_session)
-) -> Teacher:
+) -> CurrentTeacher:
     credentials_exception = fastapi.HTTPException(
         status_code=fastapi.status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -40,12 +49,19 @@ async def get_current_user(
     except InvalidTokenError:
         raise credentials_exception
 
+    user = current_user_cache.get(token_data.username)
+    if user is not None:
+        return user
+
     async_unit_of_work = AsyncSqlAlchemyUnitOfWork(session)
     async with async_unit_of_work:
         repository = auth_repo.TeacherRepository(session)
-        user = await repository.get_by_login(token_data.username)
+        teacher = await repository.get_by_login(token_data.username)
 
-    if user is None:
+    if teacher is None:
         raise credentials_exception
 
+    user = CurrentTeacher.model_validate(teacher)
+    current_user_cache.set(token_data.username, user)
+
     return user
@@ -0,0 +1,153 @@
+import asyncio
+import contextlib
+import logging
+from datetime import datetime, timezone, timedelta
+from email.message import EmailMessage
+
+import aiosmtplib
+
+from src.external_systems.unit_of_work import AsyncSqlAlchemyUnitOfWork
+from src.models import EmailOutbox
+from src.repository.mail import EmailOutboxRepository
+from src.settings.db import get_async_session
+from src.settings.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class MailOutboxWorker:
+    """Sends messages queued in the email_outbox table over one reused SMTP connection."""
+
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._smtp: aiosmtplib.SMTP | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        await self._disconnect()
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                sent = await self.drain()
+            except Exception:
+                logger.exception('Failed to drain the email outbox')
+                sent = 0
+
+            if sent < Config.MAIL_OUTBOX_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), Config.MAIL_OUTBOX_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Nothing was queued for a while, the server would drop the connection anyway
+                    await self._disconnect()
+                self._wakeup.clear()
+
+    async def drain(self) -> int:
+        # The claim is committed before anything is sent, no row lock is held across SMTP round trips
+        session = get_async_session()
+        async with AsyncSqlAlchemyUnitOfWork(session):
+            messages = await EmailOutboxRepository(session).claim_due(
+                Config.MAIL_OUTBOX_BATCH_SIZE,
+                datetime.now(timezone.utc) + timedelta(seconds=Config.MAIL_OUTBOX_LEASE)
+            )
+
+        for message in messages:
+            try:
+                email = self._build(message)
+            except Exception as e:
+                # A malformed message fails the same way on every attempt
+                logger.warning('Email %s can not be built: %s', message.id, e)
+                await self._mark_failed_attempt(message.id, str(e), None)
+                continue
+
+            try:
+                await self._send(email)
+            except Exception as e:
+                if isinstance(e, (aiosmtplib.SMTPException, OSError)):
+                    await self._disconnect()
+                else:
+                    logger.exception('Failed to send email %s', message.id)
+                await self._mark_failed_attempt(message.id, str(e), self._next_attempt_at(message))
+            else:
+                await self._mark_sent(message.id)
+
+        return len(messages)
+
+    @staticmethod
+    def _build(message: EmailOutbox) -> EmailMessage:
+        email = EmailMessage()
+        email['From'] = Config.MAIL_SENDING_CONFIG.MAIL_FROM
+        email['To'] = message.recipient
+        email['Subject'] = message.subject
+        email.set_content(message.body, subtype='html')
+        return email
+
+    async def _send(self, email: EmailMessage) -> None:
+        if Config.MAIL_BACKEND == 'noop':
+            return
+
+        try:
+            await (await self._connect()).send_message(email)
+        except aiosmtplib.SMTPServerDisconnected:
+            await self._disconnect()
+            await (await self._connect()).send_message(email)
+
+    @staticmethod
+    async def _mark_sent(idx: int) -> None:
+        session = get_async_session()
+        async with AsyncSqlAlchemyUnitOfWork(session):
+            await EmailOutboxRepository(session).mark_sent([idx])
+
+    @staticmethod
+    async def _mark_failed_attempt(idx: int, error: str, next_attempt_at: datetime | None) -> None:
+        session = get_async_session()
+        async with AsyncSqlAlchemyUnitOfWork(session):
+            await EmailOutboxRepository(session).mark_failed_attempt(idx, error, next_attempt_at)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        if self._smtp is None or not self._smtp.is_connected:
+            mail_config = Config.MAIL_SENDING_CONFIG
+            self._smtp = aiosmtplib.SMTP(
+                hostname=mail_config.MAIL_SERVER,
+                port=mail_config.MAIL_PORT,
+                use_tls=mail_config.MAIL_SSL_TLS,
+                start_tls=mail_config.MAIL_STARTTLS,
+                username=mail_config.MAIL_USERNAME,
+                password=mail_config.MAIL_PASSWORD.get_secret_value(),
+                timeout=mail_config.TIMEOUT
+            )
+            await self._smtp.connect()
+
+        return self._smtp
+
+    async def _disconnect(self) -> None:
+        if self._smtp is not None:
+            with contextlib.suppress(aiosmtplib.SMTPException, OSError):
+                await self._smtp.quit()
+            self._smtp = None
+
+    @staticmethod
+    def _next_attempt_at(message: EmailOutbox) -> datetime | None:
+        attempt = message.attempts + 1
+
+        if attempt >= Config.MAIL_MAX_ATTEMPTS:
+            return None
+
+        delay = Config.MAIL_RETRY_DELAY * 2 ** (attempt - 1)
+        return datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+
+mail_outbox = MailOutboxWorker()
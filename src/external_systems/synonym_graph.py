@@ -0,0 +1,339 @@
+import asyncio
+import contextlib
+import logging
+import typing as t
+from array import array
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.external_systems.unit_of_work import AsyncSqlAlchemyUnitOfWork
+from src.metrics import Gauge
+from src.repository import lesson as lesson_repo
+from src.settings.db import get_async_session
+from src.settings.settings import Config
+
+logger = logging.getLogger(__name__)
+
+PENDING_LEXEMES_KEY = 'synonym_graph_lexemes'
+
+# Edges added since the last compaction, below this many they are not worth a rebuild
+MIN_COMPACTION_EDGES = 1024
+
+# A lexeme id, its title and the synonym titles it was created with
+LexemeSynonyms = tuple[int, str, t.List[str]]
+
+
+class SynonymGraph:
+    """Undirected graph of lexeme titles and their synonyms kept in memory.
+
+    Every distinct title is a term with an integer id. Neighbours are stored in
+    CSR form: the neighbours of a term are neighbours[offsets[term]:offsets[term + 1]].
+    Lexemes created after the load go to small per-term arrays that are merged
+    into new CSR arrays in a thread once they grow. The CSR arrays are never
+    modified in place, only replaced. Lexemes and synonyms are never deleted.
+
+    Every process keeps its own graph. Lexemes created by this process are
+    added on commit, ones created elsewhere (other workers, upload jobs,
+    import scripts) by a refresh every SYNONYM_GRAPH_REFRESH_INTERVAL seconds
+    that reads ids above the highest one read so far. A lexeme committed
+    after one with a higher id is missed by the refresh, ensure_lexemes adds
+    it when it is asked for.
+    """
+
+    def __init__(self):
+        self._term_ids: dict[str, int] = {}
+        self._titles: list[str] = []
+        self._lexeme_terms: dict[int, int] = {}
+        self._last_lexeme_id: int | None = None
+        self._offsets = array('i', [0])
+        self._neighbours = array('i')
+        self._added: dict[int, array] = {}
+        self._added_edges = 0
+        self._pending: list[LexemeSynonyms] = []
+        self._task: asyncio.Task | None = None
+        self._compaction: asyncio.Task | None = None
+        self.ready = False
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._compaction):
+            if task is not None:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+        self._task = self._compaction = None
+
+    async def _run(self) -> None:
+        while True:
+            action = self.refresh if self.ready else self.load
+            try:
+                await action()
+            except Exception:
+                logger.exception('Failed to %s the synonym graph', action.__name__)
+
+            await asyncio.sleep(Config.SYNONYM_GRAPH_REFRESH_INTERVAL)
+
+    async def load(self) -> None:
+        term_ids: dict[str, int] = {}
+        titles: list[str] = []
+        lexeme_terms: dict[int, int] = {}
+        sources, targets = array('i'), array('i')
+
+        def intern(title: str) -> int:
+            term = term_ids.get(title)
+            if term is None:
+                term = term_ids[title] = len(titles)
+                titles.append(title)
+            return term
+
+        session = get_async_session()
+        # Lexemes and synonyms are read from one snapshot, so no synonym misses its lexeme
+        await session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+
+        async with AsyncSqlAlchemyUnitOfWork(session):
+            lexemes = lesson_repo.LexemeRepository(session)
+            after_id = None
+            while rows := await lexemes.list_titles(after_id, Config.SYNONYM_GRAPH_LOAD_BATCH_SIZE):
+                for lexeme_id, title in rows:
+                    lexeme_terms[lexeme_id] = intern(title)
+                after_id = rows[-1][0]
+
+            synonyms = lesson_repo.WordSynonymRepository(session)
+            after_id = None
+            while rows := await synonyms.list_edges(after_id, Config.SYNONYM_GRAPH_LOAD_BATCH_SIZE):
+                for _, lexeme_id, title in rows:
+                    source, target = lexeme_terms[lexeme_id], intern(self._normalize(title))
+                    if source != target:
+                        sources.extend((source, target))
+                        targets.extend((target, source))
+                after_id = rows[-1][0]
+
+        # Building the arrays takes a while on a large vocabulary, requests keep being served meanwhile
+        offsets, neighbours = await asyncio.to_thread(self._to_csr, len(titles), sources, targets)
+
+        self._term_ids, self._titles, self._lexeme_terms = term_ids, titles, lexeme_terms
+        self._last_lexeme_id = max(lexeme_terms, default=None)
+        self._offsets, self._neighbours = offsets, neighbours
+        self._added, self._added_edges = {}, 0
+        self.ready = True
+
+        pending, self._pending = self._pending, []
+        self.add_lexemes(pending)
+        logger.info('Synonym graph loaded: %s terms, %s edges', len(titles), len(neighbours) // 2)
+
+    async def refresh(self) -> None:
+        """Adds the lexemes created since the load or the previous refresh, by any process."""
+
+        session = get_async_session()
+        async with AsyncSqlAlchemyUnitOfWork(session):
+            lexemes = lesson_repo.LexemeRepository(session)
+            while rows := await lexemes.list_titles(self._last_lexeme_id, Config.SYNONYM_GRAPH_LOAD_BATCH_SIZE):
+                self.add_lexemes(await self._with_synonyms(session, rows))
+                self._last_lexeme_id = rows[-1][0]
+
+    async def ensure_lexemes(self, session: AsyncSession, lexeme_ids: t.Iterable[int]) -> None:
+        """Reads the lexemes the graph does not have yet with the caller's session."""
+
+        missing = set(lexeme_ids) - self._lexeme_terms.keys() - {None}
+        if self.ready and missing:
+            rows = await lesson_repo.LexemeRepository(session).get_titles(missing)
+            self.add_lexemes(await self._with_synonyms(session, rows))
+
+    def add_lexemes(self, lexemes: t.Iterable[LexemeSynonyms]) -> None:
+        if not self.ready:
+            self._pending.extend(lexemes)
+            return
+
+        for lexeme_id, title, synonyms in lexemes:
+            # The same lexeme may be reported by every transaction that asked for it
+            if lexeme_id in self._lexeme_terms:
+                continue
+
+            source = self._lexeme_terms[lexeme_id] = self._intern(title)
+            for synonym in synonyms:
+                target = self._intern(self._normalize(synonym))
+                if source != target:
+                    self._added.setdefault(source, array('i')).append(target)
+                    self._added.setdefault(target, array('i')).append(source)
+                    self._added_edges += 1
+
+        if self._compaction is None and self._added_edges > max(MIN_COMPACTION_EDGES, len(self._neighbours) // 8):
+            # Called from an after_commit listener, merging here would block every request for the rebuild
+            self._compaction = asyncio.get_running_loop().create_task(self._compact())
+
+    def add_after_commit(self, session: AsyncSession, lexemes: t.Iterable[LexemeSynonyms]) -> None:
+        """Adds the lexemes once the caller's transaction is committed."""
+
+        session.info.setdefault(PENDING_LEXEMES_KEY, []).extend(lexemes)
+
+    def related(self, lexeme_id: int, hops: int, limit: int) -> t.List[tuple[str, int]]:
+        """Titles reachable from the lexeme within the given number of hops, nearest first."""
+
+        start = self._lexeme_terms.get(lexeme_id)
+        if start is None:
+            return []
+
+        seen = {start}
+        frontier = [start]
+        related = []
+
+        for distance in range(1, hops + 1):
+            reached = []
+            for term in frontier:
+                for neighbour in self._neighbours_of(term):
+                    if neighbour in seen:
+                        continue
+
+                    seen.add(neighbour)
+                    reached.append(neighbour)
+                    related.append((self._titles[neighbour], distance))
+                    if len(related) >= limit:
+                        return related
+
+            frontier = reached
+
+        return related
+
+    def shared_synonyms(self, words: t.Iterable[tuple[int, int]]) -> t.List[tuple[str, t.List[int]]]:
+        """Groups words by the titles their lexemes have in common.
+
+        Takes (word id, lexeme id) pairs. A lexeme's own title counts as well,
+        so a word listed as a synonym of another one shares a group with it.
+        """
+
+        words_by_lexeme: dict[int, list[int]] = {}
+        for word_id, lexeme_id in words:
+            words_by_lexeme.setdefault(lexeme_id, []).append(word_id)
+
+        lexemes_by_term: dict[int, list[int]] = {}
+        for lexeme_id in words_by_lexeme:
+            term = self._lexeme_terms.get(lexeme_id)
+            if term is None:
+                continue
+
+            for shared in {term, *self._neighbours_of(term)}:
+                lexemes_by_term.setdefault(shared, []).append(lexeme_id)
+
+        return sorted(
+            (
+                self._titles[term],
+                sorted(word_id for lexeme_id in lexeme_ids for word_id in words_by_lexeme[lexeme_id])
+            ) for term, lexeme_ids in lexemes_by_term.items() if len(lexeme_ids) > 1
+        )
+
+    def stats(self) -> dict[tuple, float]:
+        return {
+            ('terms',): len(self._titles),
+            ('edges',): len(self._neighbours) // 2 + self._added_edges,
+        }
+
+    def _neighbours_of(self, term: int) -> t.Iterable[int]:
+        # Terms interned after the last compaction have no CSR slot yet
+        if term + 1 < len(self._offsets):
+            neighbours = self._neighbours[self._offsets[term]:self._offsets[term + 1]]
+        else:
+            neighbours = ()
+
+        added = self._added.get(term)
+        return (*neighbours, *added) if added else neighbours
+
+    @staticmethod
+    async def _with_synonyms(session: AsyncSession, rows: t.List[tuple[int, str]]) -> t.List[LexemeSynonyms]:
+        synonyms: dict[int, list[str]] = {}
+        for lexeme_id, title in await lesson_repo.WordSynonymRepository(session).list_for_lexemes(
+            lexeme_id for lexeme_id, _ in rows
+        ):
+            synonyms.setdefault(lexeme_id, []).append(title)
+
+        return [(lexeme_id, title, synonyms.get(lexeme_id, [])) for lexeme_id, title in rows]
+
+    def _intern(self, title: str) -> int:
+        term = self._term_ids.get(title)
+        if term is None:
+            term = self._term_ids[title] = len(self._titles)
+            self._titles.append(title)
+        return term
+
+    async def _compact(self) -> None:
+        try:
+            added = {term: array('i', neighbours) for term, neighbours in self._added.items()}
+            offsets, neighbours = await asyncio.to_thread(
+                self._merge, len(self._titles), self._offsets, self._neighbours, added
+            )
+
+            # Only appends happened meanwhile, whatever follows the merged prefix stays in the per-term arrays
+            for term, merged in added.items():
+                remaining = self._added[term][len(merged):]
+                if remaining:
+                    self._added[term] = remaining
+                else:
+                    del self._added[term]
+
+            self._added_edges -= sum(len(merged) for merged in added.values()) // 2
+            self._offsets, self._neighbours = offsets, neighbours
+        except Exception:
+            logger.exception('Failed to compact the synonym graph')
+        finally:
+            self._compaction = None
+
+    @staticmethod
+    def _merge(size: int, offsets: array, neighbours: array, added: dict[int, array]) -> tuple[array, array]:
+        merged_offsets = array('i', [0]) * (size + 1)
+        merged_neighbours = array('i')
+
+        for term in range(size):
+            if term + 1 < len(offsets):
+                merged_neighbours.extend(neighbours[offsets[term]:offsets[term + 1]])
+            merged_neighbours.extend(added.get(term, ()))
+            merged_offsets[term + 1] = len(merged_neighbours)
+
+        return merged_offsets, merged_neighbours
+
+    @staticmethod
+    def _to_csr(size: int, sources: array, targets: array) -> tuple[array, array]:
+        offsets = array('i', [0]) * (size + 1)
+        for source in sources:
+            offsets[source + 1] += 1
+        for term in range(size):
+            offsets[term + 1] += offsets[term]
+
+        neighbours = array('i', [0]) * len(sources)
+        cursor = offsets[:-1]
+        for source, target in zip(sources, targets):
+            neighbours[cursor[source]] = target
+            cursor[source] += 1
+
+        return offsets, neighbours
+
+    @staticmethod
+    def _normalize(title: str) -> str:
+        return title.strip().lower()
+
+
+synonym_graph = SynonymGraph()
+
+
+@sa.event.listens_for(orm.Session, 'after_commit')
+def _add_committed_lexemes(session: orm.Session) -> None:
+    lexemes = session.info.pop(PENDING_LEXEMES_KEY, None)
+    if lexemes:
+        synonym_graph.add_lexemes(lexemes)
+
+
+@sa.event.listens_for(orm.Session, 'after_rollback')
+def _drop_rolled_back_lexemes(session: orm.Session) -> None:
+    session.info.pop(PENDING_LEXEMES_KEY, None)
+
+
+SYNONYM_GRAPH_SIZE = Gauge(
+    'synonym_graph_size',
+    'Terms and edges of the in-memory synonym graph',
+    ('kind',),
+    callback=synonym_graph.stats
+)
@@ -0,0 +1,165 @@
+import asyncio
+import contextlib
+import io
+import logging
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from fastapi import UploadFile
+
+from src.external_systems.unit_of_work import AsyncSqlAlchemyUnitOfWork
+from src.repository.upload import UploadJobRepository
+from src.schemas.lesson import CsvFileColumns, CsvRowError
+from src.settings.db import get_async_session
+from src.settings.settings import Config
+from src.utils import CsvFileManager, Lexicon, UnitWordsImporter
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(Exception):
+    pass
+
+
+class UploadJobWorker:
+    """Processes stored CSV uploads in batches, resuming a job from its last committed row."""
+
+    def __init__(self):
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(Config.UPLOAD_JOB_WORKERS)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+        self._tasks = []
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.process_next()
+            except Exception:
+                logger.exception('Failed to process an upload job')
+                processed = False
+
+            if not processed:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), Config.UPLOAD_JOB_POLL_INTERVAL)
+                self._wakeup.clear()
+
+    async def process_next(self) -> bool:
+        lease_id = uuid.uuid4().hex
+        session = get_async_session()
+
+        async with AsyncSqlAlchemyUnitOfWork(session):
+            job = await UploadJobRepository(session).claim(lease_id, self._lease_deadline())
+
+            if job is None:
+                return False
+
+            job_id, unit_id, content = job.id, job.unit_id, job.content
+            progress = {
+                'processed_rows': job.processed_rows,
+                'created': job.created,
+                'not_found': job.not_found,
+                'failed': job.failed,
+                'errors': list(job.errors),
+            }
+            attempts = job.attempts
+
+        try:
+            await self._process(job_id, unit_id, content, lease_id, progress)
+        except LeaseLost:
+            logger.warning('Upload job %s was taken over by another worker', job_id)
+        except Exception as e:
+            logger.exception('Upload job %s failed', job_id)
+            attempts += 1
+            await self._save(job_id, lease_id, {
+                'status': 'queued' if attempts < Config.UPLOAD_JOB_MAX_ATTEMPTS else 'failed',
+                'attempts': attempts,
+                'last_error': str(e),
+                'locked_until': self._lease_deadline(Config.UPLOAD_JOB_RETRY_DELAY * attempts),
+            })
+
+        return True
+
+    async def _process(self, job_id: int, unit_id: int, content: bytes, lease_id: str, progress: dict) -> None:
+        file = UploadFile(io.BytesIO(content))
+        rows_seen = 0
+        batch = []
+
+        async for row in CsvFileManager.stream(file):
+            rows_seen += 1
+
+            # Rows up to processed_rows were committed before a restart
+            if rows_seen <= progress['processed_rows']:
+                continue
+
+            batch.append(row)
+            if len(batch) >= Config.CSV_UPLOAD_BATCH_SIZE:
+                await self._process_batch(job_id, unit_id, lease_id, batch, progress)
+                batch = []
+
+        if batch:
+            await self._process_batch(job_id, unit_id, lease_id, batch, progress)
+
+        await self._save(job_id, lease_id, {'status': 'done', 'lease_id': None, 'last_error': None})
+
+    async def _process_batch(
+        self,
+        job_id: int,
+        unit_id: int,
+        lease_id: str,
+        batch: list[CsvFileColumns | CsvRowError],
+        progress: dict
+    ) -> None:
+        words = [row for row in batch if isinstance(row, CsvFileColumns)]
+        row_errors = [row for row in batch if isinstance(row, CsvRowError)]
+        lookup = await Lexicon.lookup(one_word.title for one_word in words)
+        found = [one_word for one_word in words if lookup.is_found(one_word.title)]
+
+        updated = {
+            'processed_rows': progress['processed_rows'] + len(batch),
+            'created': progress['created'] + len(found),
+            'not_found': progress['not_found'] + len(words) - len(found),
+            'failed': progress['failed'] + len(row_errors),
+            'errors': (progress['errors'] + [
+                row_error.model_dump() for row_error in row_errors
+            ])[:Config.CSV_UPLOAD_MAX_ERRORS],
+            'locked_until': self._lease_deadline(),
+        }
+
+        # The words and the progress are committed together, so a resumed job neither skips nor repeats rows
+        session = get_async_session()
+        async with AsyncSqlAlchemyUnitOfWork(session):
+            await UnitWordsImporter.save(session, unit_id, found, lookup)
+
+            if not await UploadJobRepository(session).update_progress(job_id, lease_id, updated):
+                raise LeaseLost()
+
+        del updated['locked_until']
+        progress.update(updated)
+
+    @staticmethod
+    async def _save(job_id: int, lease_id: str, values: dict) -> None:
+        session = get_async_session()
+        async with AsyncSqlAlchemyUnitOfWork(session):
+            await UploadJobRepository(session).update_progress(job_id, lease_id, values)
+
+    @staticmethod
+    def _lease_deadline(seconds: float | None = None) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=Config.UPLOAD_JOB_LEASE if seconds is None else seconds)
+
+
+upload_jobs = UploadJobWorker()
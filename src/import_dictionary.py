@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import json
+import time
+import typing as t
+
+from src.external_systems.unit_of_work import AsyncSqlAlchemyUnitOfWork
+from src.repository.dictionary import DictionaryEntryRepository
+from src.settings.db import AsyncPostgreSQLEngine, get_async_session
+from src.utils import OxfordApi
+
+
+def read_entries(path: str, skipped: list[int]) -> t.Iterator[dict]:
+    """Yields compact entries from a JSON lines dump of vocabulary API answers.
+
+    The title is taken from `title` when present, otherwise from `meta.id`
+    without its homograph suffix (`run:2`). Like the API lookup, only the
+    first entry of a title is kept. Records without a `shortdef` are
+    skipped, a lexeme takes its meaning from it.
+    """
+
+    seen = set()
+
+    with open(path, encoding='utf-8') as dump:
+        for line_number, line in enumerate(dump, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+                title = OxfordApi.normalize_title(record.get('title') or record['meta']['id'].split(':')[0])
+                payload = OxfordApi.compact_payload(record)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                skipped.append(line_number)
+                continue
+
+            if not payload['shortdef']:
+                skipped.append(line_number)
+                continue
+
+            if title and title not in seen:
+                seen.add(title)
+                yield {'title': title, 'payload': payload}
+
+
+async def import_dictionary(path: str, batch_size: int) -> None:
+    skipped = []
+    batch = []
+    imported = 0
+    started_at = time.perf_counter()
+
+    async def save_batch() -> None:
+        nonlocal imported
+        session = get_async_session()
+        async with AsyncSqlAlchemyUnitOfWork(session):
+            await DictionaryEntryRepository(session).bulk_import(batch)
+
+        imported += len(batch)
+        batch.clear()
+        elapsed = time.perf_counter() - started_at
+        print(f'imported {imported} entries ({imported / elapsed:.0f} entries/s)', flush=True)
+
+    for entry in read_entries(path, skipped):
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            await save_batch()
+
+    if batch:
+        await save_batch()
+
+    print(f'done: {imported} entries in {time.perf_counter() - started_at:.1f}s, {len(skipped)} lines skipped')
+    if skipped:
+        print(f'first skipped lines: {", ".join(map(str, skipped[:20]))}')
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        await import_dictionary(args.path, args.batch_size)
+    finally:
+        await AsyncPostgreSQLEngine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import a dictionary snapshot into the local dictionary store')
+    parser.add_argument('path', help='JSON lines file, one vocabulary API entry per line')
+    parser.add_argument('--batch-size', type=int, default=1000)
+
+    asyncio.run(main(parser.parse_args()))
@@ -1,11 +1,36 @@
+import contextlib
+
 import uvicorn
 import fastapi
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.api.auth import auth_router
 from src.api.lessons import lessons_router
+from src.api.metrics import metrics_router
+from src.external_systems.mail_outbox import mail_outbox
+from src.external_systems.synonym_graph import synonym_graph
+from src.external_systems.upload_jobs import upload_jobs
+from src.metrics import MetricsMiddleware
+from src.utils import OxfordApi, password_executor
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_: fastapi.FastAPI):
+    OxfordApi.open_client()
+    mail_outbox.start()
+    upload_jobs.start()
+    synonym_graph.start()
+    try:
+        yield
+    finally:
+        await synonym_graph.stop()
+        await upload_jobs.stop()
+        await mail_outbox.stop()
+        await OxfordApi.close_client()
+        password_executor.shutdown(wait=False, cancel_futures=True)
 
-app = fastapi.FastAPI()
+
+app = fastapi.FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,8 +40,11 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth_router)
 app.include_router(lessons_router)
+app.include_router(metrics_router)
 
 
 
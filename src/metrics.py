@@ -0,0 +1,208 @@
+import bisect
+import contextlib
+import time
+import typing as t
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: t.Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> t.Iterator[tuple[str, dict, float]]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: t.Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> t.Iterator[tuple[str, dict, float]]:
+        for key, value in self._values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: t.Sequence[str] = (),
+        callback: t.Callable[[], dict[tuple, float]] | None = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._callback = callback
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def samples(self) -> t.Iterator[tuple[str, dict, float]]:
+        values = self._callback() if self._callback else self._values
+
+        for key, value in values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: t.Sequence[str] = (),
+        buckets: t.Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+
+        if state is None:
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels) -> t.Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> t.Iterator[tuple[str, dict, float]]:
+        for key, (counts, total, count) in self._values.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+
+            for bound, bucket_count in zip([*map(str, self.buckets), '+Inf'], counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket', {**labels, 'le': bound}, cumulative
+
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, count
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+
+    escaped = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        escaped.append(f'{name}="{value}"')
+
+    return '{' + ','.join(escaped) + '}'
+
+
+def render_prometheus() -> str:
+    lines = []
+
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+
+        for name, labels, value in metric.samples():
+            lines.append(f'{name}{_format_labels(labels)} {float(value)!r}')
+
+    return '\n'.join(lines) + '\n'
+
+
+REGISTRY: list[Metric] = []
+
+DICTIONARY_CACHE_REQUESTS = Counter(
+    'dictionary_cache_requests_total',
+    'Dictionary lookups answered by each cache tier',
+    ('tier', 'outcome')
+)
+
+DICTIONARY_API_LATENCY = Histogram(
+    'dictionary_api_request_duration_seconds',
+    'Latency of vocabulary API lookups'
+)
+
+DICTIONARY_API_RESPONSES = Counter(
+    'dictionary_api_responses_total',
+    'Vocabulary API responses by status code',
+    ('status_code',)
+)
+
+HTTP_REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Latency of HTTP requests by route template',
+    ('method', 'route', 'status_code')
+)
+
+SQL_STATEMENT_LATENCY = Histogram(
+    'sql_statement_duration_seconds',
+    'Duration of SQL statements by kind',
+    ('operation',)
+)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and labels it with the matched route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_LATENCY.observe(
+                time.perf_counter() - start,
+                method=scope['method'],
+                route=self._route_template(scope),
+                status_code=status_code
+            )
+
+    @staticmethod
+    def _route_template(scope) -> str:
+        if 'route' in scope:
+            return scope['route'].path
+
+        # Routes added by Starlette itself (docs, openapi.json) have no parameters
+        return scope['path'] if 'endpoint' in scope else 'unmatched'
@@ -1,4 +1,7 @@
+from datetime import datetime
+
 from sqlalchemy import orm
+from sqlalchemy.dialects import postgresql
 import sqlalchemy as sa
 
 
@@ -19,6 +22,7 @@ class Teacher(Base):
     __tablename__ = 'teacher'
     __table_args__ = (
         sa.UniqueConstraint('email', 'login', name='unique_email_login'),
+        sa.Index('ix_teacher_login', 'login'),
     )
 
     fio: orm.Mapped[str] = orm.mapped_column(sa.String)
@@ -31,6 +35,9 @@ class Teacher(Base):
 
 class Unit(Base):
     __tablename__ = 'unit'
+    __table_args__ = (
+        sa.Index('ix_unit_student_id_id', 'student_id', 'id'),
+    )
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     name: orm.Mapped[str] = orm.mapped_column(sa.String)
@@ -39,23 +46,121 @@ class Unit(Base):
     words = orm.relationship("Word", back_populates="unit")
     gaaging_idx: orm.Mapped[float] = orm.mapped_column(sa.Float, nullable=True)
     diversity_idx: orm.Mapped[float] = orm.mapped_column(sa.Float, nullable=True)
+    words_count: orm.Mapped[int] = orm.mapped_column(sa.Integer, default=0, server_default='0')
+    multipart_words_count: orm.Mapped[int] = orm.mapped_column(sa.Integer, default=0, server_default='0')
+    distinct_titles_count: orm.Mapped[int] = orm.mapped_column(sa.Integer, default=0, server_default='0')
+    version: orm.Mapped[int] = orm.mapped_column(sa.Integer, default=0, server_default='0')
+
+class Lexeme(Base):
+    __tablename__ = 'lexeme'
+    __table_args__ = (
+        sa.Index('ix_lexeme_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+        sa.Index('ix_lexeme_meaning_tsv', sa.text("to_tsvector('english', meaning)"), postgresql_using='gin'),
+    )
+
+    id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
+    title: orm.Mapped[str] = orm.mapped_column(sa.String, unique=True)
+    meaning: orm.Mapped[str] = orm.mapped_column(sa.String)
+    synonyms = orm.relationship("WordSynonyms", back_populates="lexeme")
+
 
 class Word(Base):
     __tablename__ = 'word'
+    # Case-insensitive title lookups go through lexeme.title, whose trigram index also answers ILIKE
+    __table_args__ = (
+        sa.Index('ix_word_unit_id_title', 'unit_id', 'title'),
+        sa.Index('ix_word_unit_id_id', 'unit_id', 'id'),
+        sa.Index('ix_word_lexeme_id', 'lexeme_id'),
+        sa.Index(
+            'ix_word_translation_tsv',
+            sa.text("to_tsvector('english', translation)"),
+            postgresql_using='gin',
+            postgresql_where=sa.text('translation IS NOT NULL')
+        ),
+    )
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     title: orm.Mapped[str] = orm.mapped_column(sa.String)
     unit_id: orm.Mapped[int] = orm.mapped_column(sa.Integer, sa.ForeignKey('unit.id'))
     unit = orm.relationship("Unit", back_populates="words")
-    translation: orm.Mapped[str] = orm.mapped_column(sa.String)
+    lexeme_id: orm.Mapped[int] = orm.mapped_column(sa.Integer, sa.ForeignKey('lexeme.id'))
+    lexeme = orm.relationship("Lexeme", lazy='joined', innerjoin=True)
+    # Set only when the teacher replaced the dictionary meaning of the lexeme
+    translation: orm.Mapped[str] = orm.mapped_column(sa.String, nullable=True)
     topic: orm.Mapped[str] = orm.mapped_column(sa.String, nullable=True)
     completed: orm.Mapped[bool] = orm.mapped_column(sa.Boolean, default=False)
-    word_synonyms = orm.relationship("WordSynonyms", back_populates="word")
+
+    @property
+    def meaning(self) -> str:
+        return self.translation if self.translation is not None else self.lexeme.meaning
+
 
 class WordSynonyms(Base):
     __tablename__ = 'word_synonyms'
+    __table_args__ = (
+        sa.Index('ix_word_synonyms_lexeme_id_id', 'lexeme_id', 'id'),
+        sa.Index('ix_word_synonyms_title_trgm', 'title', postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}),
+    )
 
     id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
     title: orm.Mapped[str] = orm.mapped_column(sa.String)
-    word_id: orm.Mapped[int] = orm.mapped_column(sa.Integer, sa.ForeignKey('word.id'))
-    word = orm.relationship("Word", back_populates="word_synonyms")
+    lexeme_id: orm.Mapped[int] = orm.mapped_column(sa.Integer, sa.ForeignKey('lexeme.id'))
+    lexeme = orm.relationship("Lexeme", back_populates="synonyms")
+
+
+class DictionaryEntry(Base):
+    __tablename__ = 'dictionary_entry'
+
+    title: orm.Mapped[str] = orm.mapped_column(sa.String, primary_key=True)
+    payload: orm.Mapped[dict] = orm.mapped_column(postgresql.JSONB, nullable=True)
+    # NULL for entries imported from a dictionary snapshot, they never expire
+    expires_at: orm.Mapped[datetime] = orm.mapped_column(sa.DateTime(timezone=True), nullable=True)
+
+
+class EmailOutbox(Base):
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        sa.Index(
+            'ix_email_outbox_queued_next_attempt_at',
+            'next_attempt_at',
+            postgresql_where=sa.text("status = 'queued'")
+        ),
+    )
+
+    id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
+    recipient: orm.Mapped[str] = orm.mapped_column(sa.String)
+    subject: orm.Mapped[str] = orm.mapped_column(sa.String)
+    body: orm.Mapped[str] = orm.mapped_column(sa.Text)
+    status: orm.Mapped[str] = orm.mapped_column(sa.String, default='queued', server_default='queued')
+    attempts: orm.Mapped[int] = orm.mapped_column(sa.Integer, default=0, server_default='0')
+    last_error: orm.Mapped[str] = orm.mapped_column(sa.String, nullable=True)
+    next_attempt_at: orm.Mapped[datetime] = orm.mapped_column(sa.DateTime(timezone=True), server_default=sa.func.now())
+    created_at: orm.Mapped[datetime] = orm.mapped_column(sa.DateTime(timezone=True), server_default=sa.func.now())
+
+
+class UploadJob(Base):
+    __tablename__ = 'upload_job'
+    __table_args__ = (
+        sa.Index(
+            'ix_upload_job_active_locked_until',
+            'locked_until',
+            postgresql_where=sa.text("status IN ('queued', 'running')")
+        ),
+    )
+
+    id: orm.Mapped[int] = orm.mapped_column(primary_key=True)
+    unit_id: orm.Mapped[int] = orm.mapped_column(sa.Integer, sa.ForeignKey('unit.id'))
+    filename: orm.Mapped[str] = orm.mapped_column(sa.String, nullable=True)
+    content: orm.Mapped[bytes] = orm.mapped_column(sa.LargeBinary, deferred=True)
+    status: orm.Mapped[str] = orm.mapped_column(sa.String, default='queued', server_default='queued')
+    processed_rows: orm.Mapped[int] = orm.mapped_column(sa.Integer, default=0, server_default='0')
+    created: orm.Mapped[int] = orm.mapped_column(sa.Integer, default=0, server_default='0')
+    not_found: orm.Mapped[int] = orm.mapped_column(sa.Integer, default=0, server_default='0')
+    failed: orm.Mapped[int] = orm.mapped_column(sa.Integer, default=0, server_default='0')
+    errors: orm.Mapped[list] = orm.mapped_column(postgresql.JSONB, default=list, server_default='[]')
+    attempts: orm.Mapped[int] = orm.mapped_column(sa.Integer, default=0, server_default='0')
+    last_error: orm.Mapped[str] = orm.mapped_column(sa.String, nullable=True)
+    lease_id: orm.Mapped[str] = orm.mapped_column(sa.String, nullable=True)
+    locked_until: orm.Mapped[datetime] = orm.mapped_column(sa.DateTime(timezone=True), server_default=sa.func.now())
+    created_at: orm.Mapped[datetime] = orm.mapped_column(sa.DateTime(timezone=True), server_default=sa.func.now())
+    updated_at: orm.Mapped[datetime] = orm.mapped_column(sa.DateTime(timezone=True), server_default=sa.func.now())
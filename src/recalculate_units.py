@@ -0,0 +1,54 @@
+import argparse
+import asyncio
+import time
+
+from src.external_systems.unit_of_work import AsyncSqlAlchemyUnitOfWork
+from src.repository import lesson as lesson_repo
+from src.settings.db import AsyncPostgreSQLEngine, get_async_session
+from src.utils import UnitWordsCounter
+
+
+async def recalculate_units(from_id: int | None, to_id: int | None, batch_size: int) -> None:
+    session = get_async_session()
+    last_id = from_id - 1 if from_id is not None else None
+    processed = 0
+    started_at = time.perf_counter()
+
+    while True:
+        async with AsyncSqlAlchemyUnitOfWork(session):
+            unit_ids = await lesson_repo.UnitRepository(session).list_ids(
+                after_id=last_id,
+                to_id=to_id,
+                limit=batch_size
+            )
+            await UnitWordsCounter.recalculate(session, unit_ids)
+
+        if not unit_ids:
+            break
+
+        last_id = unit_ids[-1]
+        processed += len(unit_ids)
+        elapsed = time.perf_counter() - started_at
+        print(
+            f'recalculated {processed} units up to id {last_id} '
+            f'({processed / elapsed:.0f} units/s), resume with --from-id {last_id + 1}',
+            flush=True
+        )
+
+    print(f'done: {processed} units in {time.perf_counter() - started_at:.1f}s')
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        await recalculate_units(args.from_id, args.to_id, args.batch_size)
+    finally:
+        await AsyncPostgreSQLEngine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Recalculate word counters and indices of units')
+    parser.add_argument('--from-id', type=int, default=None, help='first unit id to recalculate')
+    parser.add_argument('--to-id', type=int, default=None, help='last unit id to recalculate')
+    parser.add_argument('--batch-size', type=int, default=1000)
+
+    asyncio.run(main(parser.parse_args()))
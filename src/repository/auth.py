@@ -13,7 +13,7 @@ class TeacherRepository(AbstractRepository):
         stmt = sa.insert(Teacher).values(
             login=body.login,
             email=body.email,
-            password=Password.get_password_hash(body.password),
+            password=await Password.get_password_hash(body.password),
             fio=body.fio
         )
         teacher = await self.session.execute(stmt)
@@ -39,7 +39,7 @@ class TeacherRepository(AbstractRepository):
         return teacher
 
     async def update(self, idx: int, data: dict) -> None:
-        stmt = sa.update(Teacher).values(**data)
+        stmt = sa.update(Teacher).where(Teacher.id == idx).values(**data)
         await self.session.execute(stmt)
 
 
@@ -51,7 +51,7 @@ class LoginRepository(AbstractRepository):
         if not teacher:
             raise AuthError('Пользователь с таким username не найден')
 
-        if not Password.verify_password(body.password, teacher.password):
+        if not await Password.verify_password(body.password, teacher.password):
             raise AuthError('Неверный пароль')
 
         return teacher
@@ -0,0 +1,57 @@
+import typing as t
+from datetime import datetime, timezone, timedelta
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from src import models
+from src.repository.abstract import AbstractRepository
+
+
+class DictionaryEntryRepository(AbstractRepository):
+
+    async def get(self, idx: str) -> models.DictionaryEntry | None:
+        return (await self.get_many([idx])).get(idx)
+
+    async def get_many(self, titles: t.Iterable[str]) -> dict[str, models.DictionaryEntry]:
+        stmt = sa.select(models.DictionaryEntry).where(
+            models.DictionaryEntry.title.in_(list(titles)),
+            sa.or_(
+                models.DictionaryEntry.expires_at.is_(None),
+                models.DictionaryEntry.expires_at > sa.func.now()
+            )
+        )
+        return {entry.title: entry for entry in (await self.session.execute(stmt)).scalars()}
+
+    async def create_many(self, entries: t.List[dict]) -> None:
+        """Upserts API answers given as {title, payload, ttl} with one executemany statement."""
+
+        if not entries:
+            return
+
+        now = datetime.now(timezone.utc)
+        stmt = postgresql.insert(models.DictionaryEntry)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.DictionaryEntry.title],
+            set_={'payload': stmt.excluded.payload, 'expires_at': stmt.excluded.expires_at}
+        )
+        await self.session.execute(stmt, [
+            {
+                'title': entry['title'],
+                'payload': entry['payload'],
+                'expires_at': now + timedelta(seconds=entry['ttl'])
+            } for entry in entries
+        ])
+
+    async def bulk_import(self, entries: t.List[dict]) -> None:
+        """Upserts snapshot entries, which replace cached API answers and never expire."""
+
+        if not entries:
+            return
+
+        stmt = postgresql.insert(models.DictionaryEntry)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.DictionaryEntry.title],
+            set_={'payload': stmt.excluded.payload, 'expires_at': stmt.excluded.expires_at}
+        )
+        await self.session.execute(stmt, [{**entry, 'expires_at': None} for entry in entries])
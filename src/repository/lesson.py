@@ -1,18 +1,52 @@
 import typing as t
 
 import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.dialects import postgresql
 
 from src import models
 from src.repository.abstract import AbstractRepository
 from src.schemas import lesson as lesson_schemas
 
+TS_CONFIG = sa.literal_column("'english'::regconfig")
+SYNONYM_RANK_WEIGHT = 0.8
+# pg_trgm takes no trigrams from a shorter substring pattern and would read the whole index for it
+MIN_SUBSTRING_QUERY_LENGTH = 3
+
+
+def paginate(stmt: sa.Select, id_column: sa.Column, after_id: int | None, limit: int | None) -> sa.Select:
+    if after_id is not None:
+        stmt = stmt.filter(id_column > after_id)
+
+    return stmt.order_by(id_column).limit(limit)
+
 
 class StudentRepository(AbstractRepository):
 
-    async def list(self, **kwargs):
+    async def list(
+        self,
+        is_active: bool | None = None,
+        after_id: int | None = None,
+        limit: int | None = None
+    ):
         stmt = sa.select(models.Student)
+        filters = []
+
+        if is_active is not None:
+            filters.append(models.Student.is_active == is_active)
+
+        stmt = paginate(stmt.filter(*filters), models.Student.id, after_id, limit)
         return (await self.session.execute(stmt)).scalars().all()
 
+    async def get_overview(self, idx: int) -> models.Student | None:
+        stmt = sa.select(models.Student).where(models.Student.id == idx).options(
+            orm.selectinload(models.Student.units)
+            .selectinload(models.Unit.words)
+            .joinedload(models.Word.lexeme)
+            .selectinload(models.Lexeme.synonyms)
+        )
+        return (await self.session.execute(stmt)).scalars().one_or_none()
+
     async def update(self, idx: int, body: dict) -> None:
         body = {key: value for key, value in body.items() if value is not None}
         stmt = sa.update(models.Student).where(models.Student.id == idx).values(**body)
@@ -28,14 +62,23 @@ class StudentRepository(AbstractRepository):
 
 class UnitRepository(AbstractRepository):
 
-    async def list(self, student_id: int | None = None):
+    async def list(
+        self,
+        student_id: int | None = None,
+        name_prefix: str | None = None,
+        after_id: int | None = None,
+        limit: int | None = None
+    ):
         stmt = sa.select(models.Unit)
         filters = []
 
         if student_id:
             filters.append(models.Unit.student_id == student_id)
 
-        stmt = stmt.filter(*filters)
+        if name_prefix:
+            filters.append(models.Unit.name.startswith(name_prefix, autoescape=True))
+
+        stmt = paginate(stmt.filter(*filters), models.Unit.id, after_id, limit)
         units = (await self.session.execute(stmt)).scalars().all()
 
         return units
@@ -44,6 +87,76 @@ class UnitRepository(AbstractRepository):
         stmt = sa.update(models.Unit).where(models.Unit.id == idx).values(**body)
         await self.session.execute(stmt)
 
+    async def update_word_counters(
+        self,
+        idx: int,
+        words: int = 0,
+        multipart_words: int = 0,
+        distinct_titles: int = 0
+    ) -> sa.Row | None:
+        stmt = sa.update(models.Unit).where(models.Unit.id == idx).values(
+            words_count=models.Unit.words_count + words,
+            multipart_words_count=models.Unit.multipart_words_count + multipart_words,
+            distinct_titles_count=models.Unit.distinct_titles_count + distinct_titles
+        ).returning(
+            models.Unit.words_count,
+            models.Unit.multipart_words_count,
+            models.Unit.distinct_titles_count
+        )
+        return (await self.session.execute(stmt)).one_or_none()
+
+    async def get_version(self, idx: int) -> int | None:
+        stmt = sa.select(models.Unit.version).where(models.Unit.id == idx)
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    async def bump_version(self, idx: int) -> None:
+        stmt = sa.update(models.Unit).where(models.Unit.id == idx).values(version=models.Unit.version + 1)
+        await self.session.execute(stmt)
+
+    async def list_ids(
+        self,
+        after_id: int | None = None,
+        to_id: int | None = None,
+        limit: int | None = None
+    ) -> t.List[int]:
+        stmt = sa.select(models.Unit.id).order_by(models.Unit.id).limit(limit)
+        filters = []
+
+        if after_id is not None:
+            filters.append(models.Unit.id > after_id)
+
+        if to_id is not None:
+            filters.append(models.Unit.id <= to_id)
+
+        stmt = stmt.filter(*filters)
+        return list((await self.session.execute(stmt)).scalars().all())
+
+    async def lock(self, unit_ids: t.Iterable[int]) -> None:
+        # Ordered by id, so two transactions locking overlapping units can not deadlock
+        stmt = sa.select(models.Unit.id).where(
+            models.Unit.id.in_(list(unit_ids))
+        ).order_by(models.Unit.id).with_for_update()
+        await self.session.execute(stmt)
+
+    async def bulk_update(self, units: t.List[dict]) -> None:
+        if units:
+            await self.session.execute(sa.update(models.Unit), units)
+
+    async def word_stats(self, unit_ids: t.Iterable[int] | None = None) -> dict[int, sa.Row]:
+        stmt = sa.select(
+            models.Word.unit_id,
+            sa.func.count().label('words_count'),
+            sa.func.count().filter(
+                models.Word.title.contains('_', autoescape=True)
+            ).label('multipart_words_count'),
+            sa.func.count(sa.distinct(models.Word.title)).label('distinct_titles_count'),
+        ).group_by(models.Word.unit_id)
+
+        if unit_ids is not None:
+            stmt = stmt.where(models.Word.unit_id.in_(list(unit_ids)))
+
+        return {row.unit_id: row for row in (await self.session.execute(stmt)).all()}
+
     async def create(
         self,
         body: lesson_schemas.CreateUnitRequest,
@@ -57,61 +170,276 @@ class UnitRepository(AbstractRepository):
 
 class WordRepository(AbstractRepository):
 
-    async def list(self, unit_id: int | None = None) -> list:
+    async def list(
+        self,
+        unit_id: int | None = None,
+        completed: bool | None = None,
+        topic: str | None = None,
+        after_id: int | None = None,
+        limit: int | None = None
+    ) -> list:
         stmt = sa.select(models.Word)
         filters = []
 
         if unit_id:
             filters.append(models.Word.unit_id == unit_id)
 
-        stmt = stmt.filter(*filters)
+        if completed is not None:
+            filters.append(models.Word.completed == completed)
+
+        if topic is not None:
+            filters.append(models.Word.topic == topic)
+
+        stmt = paginate(stmt.filter(*filters), models.Word.id, after_id, limit)
         words = (await self.session.execute(stmt)).scalars().all()
 
         return words
 
+    async def search(
+        self,
+        q: str,
+        student_id: int | None = None,
+        unit_id: int | None = None,
+        limit: int | None = None,
+        offset: int = 0
+    ) -> t.List[tuple[models.Word, float]]:
+        """Ranks words whose lexeme title, meaning, synonyms or own translation match the text.
+
+        Every branch is answered by a trigram or full-text GIN index, the
+        expressions have to stay identical to the indexed ones. Text shorter
+        than MIN_SUBSTRING_QUERY_LENGTH is only matched by similarity and full
+        text, not as a substring.
+        """
+
+        ts_query = sa.func.plainto_tsquery(TS_CONFIG, q)
+        meaning_vector = sa.func.to_tsvector(TS_CONFIG, models.Lexeme.meaning)
+        translation_vector = sa.func.to_tsvector(TS_CONFIG, models.Word.translation)
+
+        def fuzzy_match(column: sa.Column) -> sa.ColumnElement:
+            if len(q.strip()) < MIN_SUBSTRING_QUERY_LENGTH:
+                return column.op('%')(q)
+            return sa.or_(column.op('%')(q), column.icontains(q, autoescape=True))
+
+        def scoped(stmt: sa.Select) -> sa.Select:
+            if unit_id is not None:
+                stmt = stmt.where(models.Word.unit_id == unit_id)
+
+            if student_id is not None:
+                stmt = stmt.join(models.Unit, models.Unit.id == models.Word.unit_id).where(
+                    models.Unit.student_id == student_id
+                )
+
+            return stmt
+
+        lexeme_matches = sa.union_all(
+            sa.select(
+                models.Lexeme.id.label('lexeme_id'),
+                sa.func.greatest(
+                    sa.func.similarity(models.Lexeme.title, q),
+                    sa.func.ts_rank(meaning_vector, ts_query)
+                ).label('rank')
+            ).where(sa.or_(fuzzy_match(models.Lexeme.title), meaning_vector.op('@@')(ts_query))),
+            sa.select(
+                models.WordSynonyms.lexeme_id,
+                (sa.func.similarity(models.WordSynonyms.title, q) * SYNONYM_RANK_WEIGHT).label('rank')
+            ).where(fuzzy_match(models.WordSynonyms.title))
+        ).subquery()
+
+        word_matches = sa.union_all(
+            scoped(sa.select(models.Word.id.label('word_id'), lexeme_matches.c.rank).join(
+                lexeme_matches, models.Word.lexeme_id == lexeme_matches.c.lexeme_id
+            )),
+            scoped(sa.select(models.Word.id, sa.func.ts_rank(translation_vector, ts_query)).where(
+                models.Word.translation.is_not(None),
+                translation_vector.op('@@')(ts_query)
+            ))
+        ).subquery()
+
+        ranks = sa.select(
+            word_matches.c.word_id,
+            sa.func.max(word_matches.c.rank).label('rank')
+        ).group_by(word_matches.c.word_id).subquery()
+
+        stmt = sa.select(models.Word, ranks.c.rank).join(
+            ranks, models.Word.id == ranks.c.word_id
+        ).order_by(ranks.c.rank.desc(), models.Word.id).limit(limit).offset(offset)
+        return list((await self.session.execute(stmt)).tuples().all())
+
+    async def get(self, idx: int) -> models.Word | None:
+        stmt = sa.select(models.Word).where(models.Word.id == idx)
+        return (await self.session.execute(stmt)).scalars().one_or_none()
+
+    async def count_titles(self, unit_id: int, titles: t.Iterable[str]) -> dict[str, int]:
+        stmt = sa.select(models.Word.title, sa.func.count()).where(
+            models.Word.unit_id == unit_id,
+            models.Word.title.in_(set(titles))
+        ).group_by(models.Word.title)
+
+        return dict((await self.session.execute(stmt)).tuples().all())
+
     async def create(
         self,
         body: lesson_schemas.CreateUnitWordRequest | lesson_schemas.CsvFileColumns,
-        word_translation: str | None = None,
+        lexeme_id: int,
         unit_id: int | None = None
     ) -> int:
         stmt = sa.insert(models.Word).values(
             title=body.title,
             unit_id=unit_id,
             topic=body.topic,
-            translation=word_translation
+            lexeme_id=lexeme_id
         )
         result = await self.session.execute(stmt)
         return result.inserted_primary_key[0] if result.inserted_primary_key else 0
 
-    async def update(self, idx: int, body: dict) -> None:
+    async def bulk_create(self, words: t.List[dict]) -> t.List[int]:
+        if not words:
+            return []
+
+        stmt = sa.insert(models.Word).returning(models.Word.id, sort_by_parameter_order=True)
+        return list((await self.session.execute(stmt, words)).scalars().all())
+
+    async def update(self, idx: int, body: dict, unit_id: int | None = None) -> None:
         body = {key: value for key, value in body.items() if value is not None}
         stmt = sa.update(models.Word).where(models.Word.id == idx).values(**body)
+
+        if unit_id is not None:
+            stmt = stmt.where(models.Word.unit_id == unit_id)
+
         await self.session.execute(stmt)
 
+    async def bulk_update(self, unit_id: int, words: t.List[dict]) -> t.List[int]:
+        """Updates many words of the unit with one UPDATE ... FROM (VALUES ...) and returns the updated ids.
+
+        Every dict has an id and any of title, translation, completed and
+        lexeme_id, a missing or None value keeps the current one.
+        """
+
+        if not words:
+            return []
+
+        columns = {
+            'id': sa.Integer,
+            'title': sa.String,
+            'translation': sa.String,
+            'completed': sa.Boolean,
+            'lexeme_id': sa.Integer
+        }
+        values = sa.values(
+            *(sa.column(name, type_) for name, type_ in columns.items()), name='changes'
+        ).data([tuple(word.get(name) for name in columns) for word in words])
+
+        stmt = sa.update(models.Word).where(
+            models.Word.id == values.c.id,
+            models.Word.unit_id == unit_id
+        ).values({
+            # A column left out by every word is all NULL literals, which Postgres would type as text
+            getattr(models.Word, name): sa.func.coalesce(sa.cast(values.c[name], type_), getattr(models.Word, name))
+            for name, type_ in columns.items() if name != 'id'
+        }).returning(models.Word.id)
+        return list((await self.session.execute(stmt)).scalars().all())
+
 
-    async def delete(self, idx: int) -> None:
+    async def list_lexeme_ids(self, unit_id: int) -> t.List[tuple[int, int]]:
+        stmt = sa.select(models.Word.id, models.Word.lexeme_id).where(
+            models.Word.unit_id == unit_id
+        ).order_by(models.Word.id)
+        return list((await self.session.execute(stmt)).tuples().all())
+
+    async def delete(self, idx: int, unit_id: int | None = None) -> None:
         stmt = sa.delete(models.Word).where(models.Word.id == idx)
+
+        if unit_id is not None:
+            stmt = stmt.where(models.Word.unit_id == unit_id)
+
         await self.session.execute(stmt)
 
+    async def bulk_delete(self, unit_id: int, word_ids: t.Iterable[int]) -> t.List[int]:
+        stmt = sa.delete(models.Word).where(
+            models.Word.unit_id == unit_id,
+            models.Word.id.in_(list(word_ids))
+        ).returning(models.Word.id)
+        return list((await self.session.execute(stmt)).scalars().all())
+
+class LexemeRepository(AbstractRepository):
+
+    async def get_ids(self, titles: t.Iterable[str]) -> dict[str, int]:
+        stmt = sa.select(models.Lexeme.title, models.Lexeme.id).where(models.Lexeme.title.in_(list(titles)))
+        return dict((await self.session.execute(stmt)).tuples().all())
+
+    async def list_titles(self, after_id: int | None = None, limit: int | None = None) -> t.List[tuple[int, str]]:
+        stmt = paginate(sa.select(models.Lexeme.id, models.Lexeme.title), models.Lexeme.id, after_id, limit)
+        return list((await self.session.execute(stmt)).tuples().all())
+
+    async def get_titles(self, ids: t.Iterable[int]) -> t.List[tuple[int, str]]:
+        stmt = sa.select(models.Lexeme.id, models.Lexeme.title).where(
+            models.Lexeme.id.in_(list(ids))
+        ).order_by(models.Lexeme.id)
+        return list((await self.session.execute(stmt)).tuples().all())
+
+    async def create_many(self, lexemes: t.List[dict]) -> dict[str, int]:
+        """Inserts lexemes with their synonyms and returns ids of all the titles, including ones created meanwhile."""
+
+        if not lexemes:
+            return {}
+
+        stmt = postgresql.insert(models.Lexeme).on_conflict_do_nothing(
+            index_elements=[models.Lexeme.title]
+        ).returning(models.Lexeme.title, models.Lexeme.id)
+        created = dict((await self.session.execute(
+            stmt, [{'title': lexeme['title'], 'meaning': lexeme['meaning']} for lexeme in lexemes]
+        )).tuples().all())
+
+        # Synonyms are only added by the transaction that created the lexeme
+        await WordSynonymRepository(self.session).bulk_create_for_lexemes({
+            created[lexeme['title']]: lexeme['synonyms'] for lexeme in lexemes if lexeme['title'] in created
+        })
+
+        concurrent = [lexeme['title'] for lexeme in lexemes if lexeme['title'] not in created]
+        return {**created, **(await self.get_ids(concurrent) if concurrent else {})}
+
+
 class WordSynonymRepository(AbstractRepository):
 
-    async def bulk_create(self, titles: list, word_id: int) -> None:
-        for title in titles:
-            stmt = sa.insert(models.WordSynonyms).values(
-                title=title,
-                word_id=word_id,
-            )
-            await self.session.execute(stmt)
+    async def bulk_create_for_lexemes(self, titles_by_lexeme: dict[int, list[str]]) -> None:
+        rows = [
+            {'title': title, 'lexeme_id': lexeme_id}
+            for lexeme_id, titles in titles_by_lexeme.items()
+            for title in titles
+        ]
+
+        if rows:
+            await self.session.execute(sa.insert(models.WordSynonyms), rows)
 
-    async def list(self, word_id: int | None = None) -> list:
+    async def list_for_lexemes(self, lexeme_ids: t.Iterable[int]) -> t.List[tuple[int, str]]:
+        stmt = sa.select(models.WordSynonyms.lexeme_id, models.WordSynonyms.title).where(
+            models.WordSynonyms.lexeme_id.in_(list(lexeme_ids))
+        ).order_by(models.WordSynonyms.lexeme_id, models.WordSynonyms.id)
+        return list((await self.session.execute(stmt)).tuples().all())
+
+    async def list_edges(
+        self,
+        after_id: int | None = None,
+        limit: int | None = None
+    ) -> t.List[tuple[int, int, str]]:
+        stmt = sa.select(models.WordSynonyms.id, models.WordSynonyms.lexeme_id, models.WordSynonyms.title)
+        stmt = paginate(stmt, models.WordSynonyms.id, after_id, limit)
+        return list((await self.session.execute(stmt)).tuples().all())
+
+    async def list(
+        self,
+        word_id: int | None = None,
+        after_id: int | None = None,
+        limit: int | None = None
+    ) -> list:
         stmt = sa.select(models.WordSynonyms)
         filters = []
 
         if word_id:
-            filters.append(models.WordSynonyms.word_id == word_id)
+            lexeme_id = sa.select(models.Word.lexeme_id).where(models.Word.id == word_id).scalar_subquery()
+            filters.append(models.WordSynonyms.lexeme_id == lexeme_id)
 
-        stmt = stmt.filter(*filters)
+        stmt = paginate(stmt.filter(*filters), models.WordSynonyms.id, after_id, limit)
         word_synonyms = (await self.session.execute(stmt)).scalars().all()
 
         return word_synonyms
\ No newline at end of file
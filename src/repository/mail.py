@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from src import models
+from src.repository.abstract import AbstractRepository
+
+
+class EmailOutboxRepository(AbstractRepository):
+
+    async def create(self, recipient: str, subject: str, body: str) -> None:
+        stmt = sa.insert(models.EmailOutbox).values(
+            recipient=recipient,
+            subject=subject,
+            body=body
+        )
+        await self.session.execute(stmt)
+
+    async def claim_due(self, limit: int, lease_until: datetime) -> list[models.EmailOutbox]:
+        """Moves due messages to the end of the lease and returns them.
+
+        Other workers skip them until then, a message whose sender died
+        before marking it becomes due again once the lease expires.
+        """
+
+        due = sa.select(models.EmailOutbox.id).where(
+            models.EmailOutbox.status == 'queued',
+            models.EmailOutbox.next_attempt_at <= sa.func.now()
+        ).order_by(
+            models.EmailOutbox.next_attempt_at
+        ).limit(limit).with_for_update(skip_locked=True)
+
+        stmt = sa.update(models.EmailOutbox).where(models.EmailOutbox.id.in_(due)).values(
+            next_attempt_at=lease_until
+        ).returning(models.EmailOutbox)
+
+        messages = (await self.session.execute(stmt)).scalars().all()
+        return sorted(messages, key=lambda message: message.id)
+
+    async def mark_sent(self, ids: list[int]) -> None:
+        if ids:
+            stmt = sa.update(models.EmailOutbox).where(models.EmailOutbox.id.in_(ids)).values(
+                status='sent',
+                attempts=models.EmailOutbox.attempts + 1,
+                last_error=None
+            )
+            await self.session.execute(stmt)
+
+    async def mark_failed_attempt(self, idx: int, error: str, next_attempt_at: datetime | None) -> None:
+        stmt = sa.update(models.EmailOutbox).where(models.EmailOutbox.id == idx).values(
+            status='queued' if next_attempt_at else 'failed',
+            attempts=models.EmailOutbox.attempts + 1,
+            last_error=error,
+            next_attempt_at=next_attempt_at or models.EmailOutbox.next_attempt_at
+        )
+        await self.session.execute(stmt)
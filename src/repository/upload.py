@@ -0,0 +1,55 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+
+from src import models
+from src.repository.abstract import AbstractRepository
+
+
+class UploadJobRepository(AbstractRepository):
+
+    async def create(self, unit_id: int, filename: str | None, content: bytes) -> sa.Row:
+        stmt = sa.insert(models.UploadJob).values(
+            unit_id=unit_id,
+            filename=filename,
+            content=content
+        ).returning(models.UploadJob.id, models.UploadJob.status)
+        return (await self.session.execute(stmt)).one()
+
+    async def get(self, idx: int) -> models.UploadJob | None:
+        stmt = sa.select(models.UploadJob).where(models.UploadJob.id == idx)
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    async def claim(self, lease_id: str, locked_until: datetime) -> models.UploadJob | None:
+        """Takes the oldest job that is queued or whose worker stopped renewing its lease."""
+
+        stmt = sa.select(models.UploadJob).where(
+            models.UploadJob.status.in_(('queued', 'running')),
+            models.UploadJob.locked_until <= sa.func.now()
+        ).order_by(
+            models.UploadJob.id
+        ).limit(1).with_for_update(skip_locked=True).options(orm.undefer(models.UploadJob.content))
+
+        job = (await self.session.execute(stmt)).scalar_one_or_none()
+
+        if job is not None:
+            await self.session.execute(
+                sa.update(models.UploadJob).where(models.UploadJob.id == job.id).values(
+                    status='running',
+                    lease_id=lease_id,
+                    locked_until=locked_until,
+                    updated_at=sa.func.now()
+                )
+            )
+
+        return job
+
+    async def update_progress(self, idx: int, lease_id: str, values: dict) -> bool:
+        """Saves progress only while the lease is still held, returns False if another worker took the job."""
+
+        stmt = sa.update(models.UploadJob).where(
+            models.UploadJob.id == idx,
+            models.UploadJob.lease_id == lease_id
+        ).values(**values, updated_at=sa.func.now())
+        return (await self.session.execute(stmt)).rowcount > 0
@@ -1,7 +1,7 @@
 import pydantic
 
 class RegisterUserModel(pydantic.BaseModel):
-    email: str = pydantic.Field(default='test_mail@gmail.com')
+    email: pydantic.EmailStr = pydantic.Field(default='test_mail@gmail.com')
     login: str = pydantic.Field(default='тестовый логин')
     fio: str = pydantic.Field(default='Тестовый тест тестович')
     password: str = pydantic.Field()
@@ -25,5 +25,15 @@ class UserResponseModel(pydantic.BaseModel):
     login: str = pydantic.Field(default='тестовый логин')
 
 
+class CurrentTeacher(pydantic.BaseModel):
+    model_config = pydantic.ConfigDict(from_attributes=True, frozen=True)
+
+    id: int
+    login: str
+    email: str
+    fio: str
+    is_active: bool
+
+
 class AccessTokenModel(pydantic.BaseModel):
     access_token: str = pydantic.Field()
\ No newline at end of file
@@ -1,6 +1,37 @@
 import pydantic
 
 
+class PaginationQuery(pydantic.BaseModel):
+    after_id: int | None = None
+    limit: int = pydantic.Field(default=100, ge=1, le=1000)
+
+
+class StudentListQuery(PaginationQuery):
+    is_active: bool | None = None
+
+
+class UnitListQuery(PaginationQuery):
+    name_prefix: str | None = None
+
+
+class WordListQuery(PaginationQuery):
+    completed: bool | None = None
+    topic: str | None = None
+
+
+class WordSearchQuery(pydantic.BaseModel):
+    q: str = pydantic.Field(min_length=1, max_length=100)
+    student_id: int | None = None
+    unit_id: int | None = None
+    limit: int = pydantic.Field(default=20, ge=1, le=100)
+    offset: int = pydantic.Field(default=0, ge=0, le=1000)
+
+
+class RelatedWordsQuery(pydantic.BaseModel):
+    hops: int = pydantic.Field(default=2, ge=1, le=4)
+    limit: int = pydantic.Field(default=50, ge=1, le=500)
+
+
 class StudentForListingResponse(pydantic.BaseModel):
     id: int
     fio: str
@@ -22,6 +53,10 @@ class WordForListingResponse(pydantic.BaseModel):
     topic: str | None = None
     is_completed: bool
 
+class WordSearchResponse(WordForListingResponse):
+    unit_id: int
+    rank: float
+
 class CreateUnitWordRequest(pydantic.BaseModel):
     title: str
     topic: str
@@ -34,6 +69,18 @@ class UpdateUnitWordRequest(pydantic.BaseModel):
     translation: str | None = None
     completed: bool | None = None
 
+class BulkUpdateUnitWordRequest(UpdateUnitWordRequest):
+    id: int
+
+class BulkUpdateUnitWordsRequest(pydantic.BaseModel):
+    words: list[BulkUpdateUnitWordRequest] = pydantic.Field(min_length=1, max_length=1000)
+
+class BulkDeleteUnitWordsQuery(pydantic.BaseModel):
+    word_ids: list[int] = pydantic.Field(min_length=1, max_length=500)
+
+class BulkUnitWordsResponse(pydantic.BaseModel):
+    word_ids: list[int]
+
 class CreateStudentRequest(pydantic.BaseModel):
     login: str
     fio: str
@@ -58,6 +105,44 @@ class CsvFileColumns(pydantic.BaseModel):
     title: str
     topic: str
 
+class CsvRowError(pydantic.BaseModel):
+    row: int
+    error: str
+
+class UploadUnitWordsResponse(pydantic.BaseModel):
+    created: int = 0
+    not_found: int = 0
+    failed: int = 0
+    errors: list[CsvRowError] = []
+
+class UploadJobCreatedResponse(pydantic.BaseModel):
+    id: int
+    status: str
+
+class UploadJobResponse(UploadUnitWordsResponse):
+    id: int
+    unit_id: int
+    status: str
+    processed_rows: int
+    last_error: str | None = None
+
 class WordSynonymsSchema(pydantic.BaseModel):
     id: int
     title: str
+
+class RelatedWordResponse(pydantic.BaseModel):
+    title: str
+    hops: int
+
+class SharedSynonymsResponse(pydantic.BaseModel):
+    synonym: str
+    word_ids: list[int]
+
+class WordOverviewResponse(WordForListingResponse):
+    synonyms: list[WordSynonymsSchema] = []
+
+class UnitOverviewResponse(UnitForListingResponse):
+    words: list[WordOverviewResponse] = []
+
+class StudentOverviewResponse(StudentForListingResponse):
+    units: list[UnitOverviewResponse] = []
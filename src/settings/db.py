@@ -1,12 +1,42 @@
+import time
+
+import sqlalchemy as sa
 import sqlalchemy.ext.asyncio as sa_io
+from sqlalchemy import pool
 
+from src.metrics import Counter, Gauge, Histogram, SQL_STATEMENT_LATENCY
 from src.settings.base import normalize_url
 from src.settings.settings import Config
 
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds',
+    'Time spent waiting for a connection from the pool'
+)
+DB_POOL_EVENTS = Counter(
+    'db_pool_events_total',
+    'Connections opened by the pool and checked out of it',
+    ('event',)
+)
+
+
+class InstrumentedAsyncAdaptedQueuePool(pool.AsyncAdaptedQueuePool):
+
+    def _do_get(self):
+        with DB_POOL_CHECKOUT_WAIT.time():
+            return super()._do_get()
+
+
 AsyncPostgreSQLEngine = sa_io.create_async_engine(
     normalize_url(Config.DB_URI),
     echo=False,
-    isolation_level=Config.SQLALCHEMY_ISOLATION_LEVEL
+    isolation_level=Config.SQLALCHEMY_ISOLATION_LEVEL,
+    poolclass=InstrumentedAsyncAdaptedQueuePool,
+    pool_size=Config.DB_POOL_SIZE,
+    max_overflow=Config.DB_MAX_OVERFLOW,
+    pool_timeout=Config.DB_POOL_TIMEOUT,
+    pool_recycle=Config.DB_POOL_RECYCLE,
+    pool_pre_ping=Config.DB_POOL_PRE_PING
 )
 
 AsyncPostgreSQLSession = sa_io.async_sessionmaker(
@@ -17,5 +47,51 @@ AsyncPostgreSQLSession = sa_io.async_sessionmaker(
     class_=sa_io.AsyncSession
 )
 
+
+@sa.event.listens_for(AsyncPostgreSQLEngine.sync_engine, 'connect')
+def _count_connect(dbapi_connection, connection_record) -> None:
+    DB_POOL_EVENTS.inc(event='connect')
+
+
+@sa.event.listens_for(AsyncPostgreSQLEngine.sync_engine, 'checkout')
+def _count_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    DB_POOL_EVENTS.inc(event='checkout')
+
+
+@sa.event.listens_for(AsyncPostgreSQLEngine.sync_engine, 'before_cursor_execute')
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    # A failed statement never reaches after_cursor_execute, the next one simply overwrites its start time
+    conn.info['statement_started_at'] = time.perf_counter()
+
+
+@sa.event.listens_for(AsyncPostgreSQLEngine.sync_engine, 'after_cursor_execute')
+def _observe_statement(conn, cursor, statement, parameters, context, executemany) -> None:
+    started_at = conn.info.pop('statement_started_at', None)
+    if started_at is None:
+        return
+
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'UNKNOWN'
+    SQL_STATEMENT_LATENCY.observe(time.perf_counter() - started_at, operation=operation)
+
+
+def pool_stats() -> dict[tuple, float]:
+    engine_pool = AsyncPostgreSQLEngine.pool
+
+    return {
+        ('size',): engine_pool.size(),
+        ('checked_out',): engine_pool.checkedout(),
+        ('checked_in',): engine_pool.checkedin(),
+        ('overflow',): max(engine_pool.overflow(), 0),
+    }
+
+
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections',
+    'Connections of the SQLAlchemy pool by state',
+    ('state',),
+    callback=pool_stats
+)
+
+
 def get_async_session():
-    return AsyncPostgreSQLSession()
\ No newline at end of file
+    return AsyncPostgreSQLSession()
@@ -9,14 +9,52 @@ class Config:
     VERIFY_SECRET_KEY = os.getenv('VERIFY_SECRET_KEY')
     AUTH_ALGORITHM = os.getenv('AUTH_ALGORITHM')
     EMAIL_VERIFICATION_URL = os.getenv('EMAIL_VERIFICATION_URL')
+    PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', '4'))
+    CURRENT_USER_CACHE_SIZE = int(os.getenv('CURRENT_USER_CACHE_SIZE', '1000'))
+    CURRENT_USER_CACHE_TTL = int(os.getenv('CURRENT_USER_CACHE_TTL', '60'))
     DB_HOST = os.getenv('DB_HOST')
     DB_USERNAME = os.getenv('DB_USERNAME')
     DB_PASSWORD = os.getenv('DB_PASSWORD')
     DB_PORT = int(os.getenv('DB_PORT', '5432'))
     DB_NAME = os.getenv('DB_NAME')
     DB_URI = f'postgresql+asyncpg://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
     ENGLISH_VOCABULAR_URL = os.getenv('ENGLISH_VOCABULAR_URL')
     ENGLISH_VOCABULAR_API_KEY = os.getenv('ENGLISH_VOCABULAR_API_KEY')
+    VOCABULAR_MAX_CONNECTIONS = int(os.getenv('VOCABULAR_MAX_CONNECTIONS', '50'))
+    VOCABULAR_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('VOCABULAR_MAX_KEEPALIVE_CONNECTIONS', '20'))
+    VOCABULAR_KEEPALIVE_EXPIRY = float(os.getenv('VOCABULAR_KEEPALIVE_EXPIRY', '30'))
+    VOCABULAR_HTTP2 = os.getenv('VOCABULAR_HTTP2', 'false').lower() == 'true'
+    VOCABULAR_CONNECT_TIMEOUT = float(os.getenv('VOCABULAR_CONNECT_TIMEOUT', '3'))
+    VOCABULAR_READ_TIMEOUT = float(os.getenv('VOCABULAR_READ_TIMEOUT', '10'))
+    VOCABULAR_LOOKUP_CONCURRENCY = int(os.getenv('VOCABULAR_LOOKUP_CONCURRENCY', '10'))
+    CSV_UPLOAD_CHUNK_SIZE = int(os.getenv('CSV_UPLOAD_CHUNK_SIZE', str(64 * 1024)))
+    CSV_UPLOAD_BATCH_SIZE = int(os.getenv('CSV_UPLOAD_BATCH_SIZE', '200'))
+    CSV_UPLOAD_MAX_ERRORS = int(os.getenv('CSV_UPLOAD_MAX_ERRORS', '100'))
+    CSV_UPLOAD_MAX_RECORD_SIZE = int(os.getenv('CSV_UPLOAD_MAX_RECORD_SIZE', str(64 * 1024)))
+    UPLOAD_JOB_WORKERS = int(os.getenv('UPLOAD_JOB_WORKERS', '2'))
+    UPLOAD_JOB_POLL_INTERVAL = float(os.getenv('UPLOAD_JOB_POLL_INTERVAL', '5'))
+    UPLOAD_JOB_LEASE = float(os.getenv('UPLOAD_JOB_LEASE', '300'))
+    UPLOAD_JOB_MAX_ATTEMPTS = int(os.getenv('UPLOAD_JOB_MAX_ATTEMPTS', '3'))
+    UPLOAD_JOB_RETRY_DELAY = float(os.getenv('UPLOAD_JOB_RETRY_DELAY', '60'))
+    DICTIONARY_CACHE_SIZE = int(os.getenv('DICTIONARY_CACHE_SIZE', '10000'))
+    DICTIONARY_CACHE_TTL = int(os.getenv('DICTIONARY_CACHE_TTL', str(30 * 24 * 60 * 60)))
+    DICTIONARY_CACHE_NEGATIVE_TTL = int(os.getenv('DICTIONARY_CACHE_NEGATIVE_TTL', str(60 * 60)))
+    FAST_JSON_RESPONSES = os.getenv('FAST_JSON_RESPONSES', 'false').lower() == 'true'
+    WORD_LIST_CACHE_SIZE = int(os.getenv('WORD_LIST_CACHE_SIZE', '500'))
+    WORD_LIST_CACHE_TTL = int(os.getenv('WORD_LIST_CACHE_TTL', '30'))
+    SYNONYM_GRAPH_LOAD_BATCH_SIZE = int(os.getenv('SYNONYM_GRAPH_LOAD_BATCH_SIZE', '10000'))
+    SYNONYM_GRAPH_REFRESH_INTERVAL = float(os.getenv('SYNONYM_GRAPH_REFRESH_INTERVAL', '60'))
+    MAIL_BACKEND = os.getenv('MAIL_BACKEND') or 'smtp'
+    MAIL_OUTBOX_BATCH_SIZE = int(os.getenv('MAIL_OUTBOX_BATCH_SIZE', '50'))
+    MAIL_OUTBOX_POLL_INTERVAL = float(os.getenv('MAIL_OUTBOX_POLL_INTERVAL', '30'))
+    MAIL_OUTBOX_LEASE = float(os.getenv('MAIL_OUTBOX_LEASE', '300'))
+    MAIL_MAX_ATTEMPTS = int(os.getenv('MAIL_MAX_ATTEMPTS', '5'))
+    MAIL_RETRY_DELAY = float(os.getenv('MAIL_RETRY_DELAY', '30'))
     MAIL_SENDING_CONFIG = ConnectionConfig(
         MAIL_FROM=os.getenv('SERVER_MAIL_USERNAME'),
         MAIL_USERNAME=os.getenv('SERVER_MAIL_USERNAME'),
@@ -1,21 +1,43 @@
 import abc
+import asyncio
+import codecs
+import collections
 import csv
+import hashlib
+import time
 import typing as t
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from io import StringIO
 
 import httpx
 import jwt
-import fastapi_mail
-
+import orjson
+import pydantic
+from fastapi import UploadFile
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.external_systems.synonym_graph import synonym_graph
+from src.external_systems.unit_of_work import AsyncSqlAlchemyUnitOfWork
+from src.metrics import DICTIONARY_CACHE_REQUESTS, DICTIONARY_API_LATENCY, DICTIONARY_API_RESPONSES, Gauge
 from src.models import Word
-from src.schemas.lesson import CsvFileColumns
+from src.repository import lesson as lesson_repo
+from src.repository.dictionary import DictionaryEntryRepository
+from src.schemas.lesson import CsvFileColumns, CsvRowError, WordForListingResponse
+from src.settings.db import get_async_session
 from src.settings.settings import Config
 from passlib.context import CryptContext
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the event loop
+password_executor = ThreadPoolExecutor(
+    max_workers=Config.PASSWORD_HASHING_WORKERS,
+    thread_name_prefix='password-hashing'
+)
+
 
 class Token:
 
@@ -41,7 +63,7 @@ class Token:
         return jwt.decode(token, key=Config.AUTH_SECRET_KEY, algorithms=[Config.AUTH_ALGORITHM])
 
 
-async def send_mail(email: str, token: str) -> None:
+def render_verification_mail(token: str) -> tuple[str, str]:
     template = f"""
     <html>
     <body>
@@ -50,46 +72,127 @@ async def send_mail(email: str, token: str) -> None:
     </body>
     </html>
     """
-    message = fastapi_mail.MessageSchema(
-        subject='Верификация нового пользователя',
-        recipients=[email],
-        body=template,
-        subtype=fastapi_mail.MessageType('html')
-    )
-    fm = fastapi_mail.FastMail(Config.MAIL_SENDING_CONFIG)
-    await fm.send_message(message)
+    return 'Верификация нового пользователя', template
 
 
 class Password:
 
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str):
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(plain_password: str, hashed_password: str) -> bool:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, pwd_context.verify, plain_password, hashed_password)
 
     @staticmethod
-    def get_password_hash(password: str):
-        return pwd_context.hash(password)
+    async def get_password_hash(password: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, pwd_context.hash, password)
 
 class UnitParams:
 
     @staticmethod
-    def calculate_gag_index(words_sequence: list[Word]) -> float:
-        words, syllables = [], []
-        for element in words_sequence:
-            if len(element.title.split('_')) > 1:
-                syllables.append(element)
-            else:
-                words.append(element)
+    def is_multipart(title: str) -> bool:
+        return len(title.split('_')) > 1
 
-        return 206.835 - 1.015 * (len(words) / 1) - 84.6 * (len(syllables) / len(words))
+    # The list based calculations load every word of a unit; they are kept as a fallback
+    # for code that already holds the words, everything else works from counters.
+    @staticmethod
+    def calculate_gag_index(words_sequence: list[Word]) -> float | None:
+        multipart_words = sum(1 for element in words_sequence if UnitParams.is_multipart(element.title))
+        return UnitParams.gag_index_from_counts(len(words_sequence), multipart_words)
 
     @staticmethod
     def calculate_diversity_index(words_sequence: list) -> float:
-        word_names_lst = [word.title for word in words_sequence]
-        total_words = len(word_names_lst)
-        unique_words = len(set(word_names_lst))
+        unique_words = len({word.title for word in words_sequence})
+        return UnitParams.diversity_index_from_counts(len(words_sequence), unique_words)
+
+    @staticmethod
+    def gag_index_from_counts(words_count: int, multipart_words_count: int) -> float | None:
+        single_words_count = words_count - multipart_words_count
+
+        if single_words_count == 0:
+            return None
+
+        return 206.835 - 1.015 * (single_words_count / 1) - 84.6 * (multipart_words_count / single_words_count)
+
+    @staticmethod
+    def diversity_index_from_counts(words_count: int, distinct_titles_count: int) -> float:
+        return 0 if words_count == 0 else distinct_titles_count / words_count
+
+
+class UnitWordsCounter:
+
+    @classmethod
+    async def apply(
+        cls,
+        session: AsyncSession,
+        unit_id: int,
+        added: t.Sequence[str] = (),
+        removed: t.Sequence[str] = ()
+    ) -> None:
+        """Updates the unit counters and indices after words were already added or removed."""
+
+        net_titles = collections.Counter(added)
+        net_titles.subtract(removed)
+        net_titles = {title: count for title, count in net_titles.items() if count}
+
+        if not net_titles:
+            return
+
+        title_counts = await lesson_repo.WordRepository(session).count_titles(unit_id, net_titles)
+        distinct_titles = sum(
+            1 if count > 0 else -1
+            for title, count in net_titles.items()
+            if title_counts.get(title, 0) == max(count, 0)
+        )
+
+        unit_repo = lesson_repo.UnitRepository(session)
+        counters = await unit_repo.update_word_counters(
+            unit_id,
+            words=sum(net_titles.values()),
+            multipart_words=sum(count for title, count in net_titles.items() if UnitParams.is_multipart(title)),
+            distinct_titles=distinct_titles
+        )
+
+        if counters:
+            words_count, multipart_words_count, distinct_titles_count = counters
+            await unit_repo.update(unit_id, {
+                'gaaging_idx': UnitParams.gag_index_from_counts(words_count, multipart_words_count),
+                'diversity_idx': UnitParams.diversity_index_from_counts(words_count, distinct_titles_count)
+            })
+
+    @classmethod
+    async def recalculate(cls, session: AsyncSession, unit_ids: t.Sequence[int]) -> None:
+        """Recounts the units from scratch with a single aggregate query.
+
+        The units are locked before the words are counted. A concurrent apply
+        holds the same row lock until it commits, so its words are either
+        counted here or added on top of the recounted values afterwards.
+        """
+
+        if not unit_ids:
+            return
+
+        unit_repo = lesson_repo.UnitRepository(session)
+        await unit_repo.lock(unit_ids)
+        word_stats = await unit_repo.word_stats(unit_ids)
+
+        units = []
+        for unit_id in unit_ids:
+            stats = word_stats.get(unit_id)
+            words_count = stats.words_count if stats else 0
+            multipart_words_count = stats.multipart_words_count if stats else 0
+            distinct_titles_count = stats.distinct_titles_count if stats else 0
 
-        return 0 if total_words == 0 else unique_words / total_words
+            units.append({
+                'id': unit_id,
+                'words_count': words_count,
+                'multipart_words_count': multipart_words_count,
+                'distinct_titles_count': distinct_titles_count,
+                'gaaging_idx': UnitParams.gag_index_from_counts(words_count, multipart_words_count),
+                'diversity_idx': UnitParams.diversity_index_from_counts(words_count, distinct_titles_count)
+            })
+
+        await unit_repo.bulk_update(units)
 
 
 class FileManager(abc.ABC):
@@ -117,23 +220,345 @@ class CsvFileManager(FileManager):
 
         return words
 
+    @classmethod
+    async def stream(cls, file: UploadFile) -> t.AsyncIterator[CsvFileColumns | CsvRowError]:
+        header = None
+        row_number = 0
+
+        async for values in cls._iter_rows(file):
+            if isinstance(values, list) and not any(value.strip() for value in values):
+                continue
+
+            if header is None and isinstance(values, list):
+                header = values
+                continue
+
+            row_number += 1
+
+            if isinstance(values, csv.Error):
+                yield CsvRowError(row=row_number, error=str(values))
+                continue
+
+            if len(values) != len(header):
+                yield CsvRowError(row=row_number, error=f'Ожидалось колонок: {len(header)}, получено: {len(values)}')
+                continue
+
+            row = dict(zip(header, values))
+
+            if not row.get('Term'):
+                yield CsvRowError(row=row_number, error='Не указан термин (Term)')
+                continue
+
+            if row.get('Category') is None:
+                yield CsvRowError(row=row_number, error='Не указана категория (Category)')
+                continue
+
+            yield CsvFileColumns(title=row['Term'], topic=row['Category'])
+
+    @staticmethod
+    async def _iter_rows(file: UploadFile) -> t.AsyncIterator[list[str] | csv.Error]:
+        """Parses the upload with csv.reader while reading it in chunks.
+
+        At least CSV_UPLOAD_MAX_RECORD_SIZE characters stay buffered ahead of
+        the reader, so a record within the limit never runs out of lines half
+        way. A longer one, e.g. an unclosed quote, is reported as an error and
+        parsing resumes on the line after the one it started on.
+        """
+
+        decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        feed = _CsvLineFeed(Config.CSV_UPLOAD_MAX_RECORD_SIZE)
+        reader = csv.reader(feed)
+        tail = ''
+        eof = False
+        skipping_line = False
+
+        while True:
+            while not eof and feed.buffered < Config.CSV_UPLOAD_MAX_RECORD_SIZE:
+                chunk = await file.read(Config.CSV_UPLOAD_CHUNK_SIZE)
+
+                if not chunk:
+                    eof = True
+                    tail += decoder.decode(b'', final=True)
+                    if tail:
+                        feed.append(tail)
+                    break
+
+                text = decoder.decode(chunk)
+
+                # The rest of a line that was already reported as too long
+                if skipping_line:
+                    newline = text.find('\n')
+                    if newline == -1:
+                        continue
+                    text, skipping_line = text[newline + 1:], False
+
+                *lines, tail = (tail + text).split('\n')
+                for line in lines:
+                    feed.append(line + '\n')
+
+                # A line without a newline can not grow past the limit either, its start is reported once
+                if len(tail) > Config.CSV_UPLOAD_MAX_RECORD_SIZE:
+                    feed.append(tail)
+                    tail, skipping_line = '', True
+
+            if not feed:
+                return
+
+            feed.start_record()
+            try:
+                yield next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                feed.rewind_record()
+                reader = csv.reader(feed)
+                yield e
+
+
+class _CsvLineFeed:
+    """Buffered lines handed to csv.reader, refuses to feed one record past the size limit."""
+
+    def __init__(self, max_record_size: int):
+        self.max_record_size = max_record_size
+        self.buffered = 0
+        self._lines: collections.deque[str] = collections.deque()
+        self._record_lines: list[str] = []
+        self._record_size = 0
+
+    def __bool__(self) -> bool:
+        return bool(self._lines)
+
+    def __iter__(self) -> '_CsvLineFeed':
+        return self
+
+    def __next__(self) -> str:
+        if not self._lines:
+            raise StopIteration
+
+        line = self._lines.popleft()
+        self.buffered -= len(line)
+        self._record_lines.append(line)
+        self._record_size += len(line)
+
+        # The line is consumed either way, so the next record starts after it
+        if self._record_size > self.max_record_size:
+            raise csv.Error(f'Строка длиннее {self.max_record_size} символов')
+
+        return line
+
+    def append(self, line: str) -> None:
+        self._lines.append(line)
+        self.buffered += len(line)
+
+    def start_record(self) -> None:
+        self._record_lines = []
+        self._record_size = 0
+
+    def rewind_record(self) -> None:
+        """Gives back the lines a failed record took after its first one."""
+
+        for line in reversed(self._record_lines[1:]):
+            self._lines.appendleft(line)
+            self.buffered += len(line)
+
+        self.start_record()
+
+
+class TTLCache:
+    """LRU mapping whose entries also expire after their own time to live."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: collections.OrderedDict[t.Hashable, tuple[float, t.Any]] = collections.OrderedDict()
+
+    def get(self, key: t.Hashable, default: t.Any = None) -> t.Any:
+        item = self._data.get(key)
+
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: t.Hashable, value: t.Any, ttl: float | None = None) -> None:
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: t.Hashable) -> None:
+        self._data.pop(key, None)
+
+    def items(self) -> list[tuple[t.Hashable, t.Any]]:
+        now = time.monotonic()
+        return [(key, value) for key, (expires_at, value) in self._data.items() if expires_at > now]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
+
+
 class OxfordApi:
+    cache = TTLCache(Config.DICTIONARY_CACHE_SIZE, Config.DICTIONARY_CACHE_TTL)
+    client: httpx.AsyncClient | None = None
+
+    @classmethod
+    def open_client(cls) -> httpx.AsyncClient:
+        if cls.client is None:
+            cls.client = httpx.AsyncClient(
+                http2=Config.VOCABULAR_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=Config.VOCABULAR_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.VOCABULAR_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=Config.VOCABULAR_KEEPALIVE_EXPIRY
+                ),
+                timeout=httpx.Timeout(
+                    Config.VOCABULAR_READ_TIMEOUT,
+                    connect=Config.VOCABULAR_CONNECT_TIMEOUT
+                )
+            )
+        return cls.client
+
+    @classmethod
+    async def close_client(cls) -> None:
+        if cls.client is not None:
+            await cls.client.aclose()
+            cls.client = None
+
+    @classmethod
+    def connections_stats(cls) -> dict[tuple, float]:
+        # httpx has no public pool statistics, this reads the private httpcore pool of the pinned
+        # httpx/httpcore versions and reports zeros rather than failing if that layout changes
+        pool = getattr(getattr(cls.client, '_transport', None), '_pool', None)
+        connections = getattr(pool, 'connections', None) or []
+
+        idle = sum(1 for connection in connections if getattr(connection, 'is_idle', lambda: False)())
+        return {('active',): len(connections) - idle, ('idle',): idle}
+
+    @staticmethod
+    def normalize_title(title: str) -> str:
+        return title.strip().lower()
 
     @classmethod
     async def parse_word_from_api(cls, title: str) -> dict | None:
+        return (await cls.parse_words_from_api([title]))[title]
+
+    @classmethod
+    async def parse_words_from_api(cls, titles: t.Iterable[str]) -> dict[str, dict | None]:
+        """Looks the titles up in memory, then in dictionary_entry with one query, then in the API."""
+
+        keys = {title: cls.normalize_title(title) for title in titles}
+        unique_keys = list(dict.fromkeys(keys.values()))
+        words_meta = {}
+
+        for key in unique_keys:
+            word_meta = cls.cache.get(key, _MISSING)
+            DICTIONARY_CACHE_REQUESTS.inc(tier='memory', outcome='miss' if word_meta is _MISSING else 'hit')
+
+            if word_meta is not _MISSING:
+                words_meta[key] = word_meta
+
+        missing = [key for key in unique_keys if key not in words_meta]
+
+        if missing:
+            session = get_async_session()
+            async with AsyncSqlAlchemyUnitOfWork(session):
+                entries = await DictionaryEntryRepository(session).get_many(missing)
+
+            for key in missing:
+                entry = entries.get(key)
+                DICTIONARY_CACHE_REQUESTS.inc(tier='db', outcome='hit' if entry else 'miss')
+
+                if entry:
+                    cls.cache.set(key, entry.payload, ttl=cls._memory_ttl(entry.expires_at))
+                    words_meta[key] = entry.payload
+
+        semaphore = asyncio.Semaphore(Config.VOCABULAR_LOOKUP_CONCURRENCY)
+        answers = {}
+
+        async def fetch_word(key: str) -> None:
+            async with semaphore:
+                answers[key] = await cls._request_word(key)
+
+        await asyncio.gather(*(fetch_word(key) for key in missing if key not in words_meta))
+
+        # One session stores every answer, the lookups above do not hold pool connections
+        entries = []
+        for key, (is_found, word_meta) in answers.items():
+            words_meta[key] = word_meta
+
+            if is_found is None:
+                continue
+
+            ttl = Config.DICTIONARY_CACHE_TTL if is_found else Config.DICTIONARY_CACHE_NEGATIVE_TTL
+            entries.append({'title': key, 'payload': word_meta, 'ttl': ttl})
+            cls.cache.set(key, word_meta, ttl=ttl)
+
+        if entries:
+            session = get_async_session()
+            async with AsyncSqlAlchemyUnitOfWork(session):
+                await DictionaryEntryRepository(session).create_many(entries)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
+        return {title: words_meta[key] for title, key in keys.items()}
+
+    @staticmethod
+    def _memory_ttl(expires_at: datetime | None) -> float:
+        if expires_at is None:
+            return Config.DICTIONARY_CACHE_TTL
+
+        return min(Config.DICTIONARY_CACHE_TTL, (expires_at - datetime.now(timezone.utc)).total_seconds())
+
+    @classmethod
+    async def _request_word(cls, title: str) -> tuple[bool | None, dict | None]:
+        """Returns whether the word exists upstream; None means the answer must not be cached."""
+
+        # Every call is timed and counted, failed ones under status_code="error"
+        status_code = 'error'
+        started_at = time.perf_counter()
+        try:
+            response = await cls.open_client().get(
                 f'{Config.ENGLISH_VOCABULAR_URL}/{title}',
                 params={'key': Config.ENGLISH_VOCABULAR_API_KEY}
             )
+            status_code = response.status_code
+        except httpx.HTTPError:
+            # Like a 5xx, a timeout or a connection failure reports the word as not found without caching the answer
+            return None, None
+        finally:
+            DICTIONARY_API_LATENCY.observe(time.perf_counter() - started_at)
+            DICTIONARY_API_RESPONSES.inc(status_code=status_code)
 
-            if response.status_code == 200:
-                response_json = response.json()
+        if response.status_code != 200:
+            return None, None
 
-                if isinstance(response_json, list) and isinstance(response_json[0], dict) and response_json[0].get('meta'):
-                    return response_json[0]
+        try:
+            response_json = response.json()
+        except ValueError:
+            return None, None
 
+        if isinstance(response_json, list) and response_json and isinstance(response_json[0], dict) and response_json[0].get('meta'):
+            return True, cls.compact_payload(response_json[0])
+
+        return False, None
+
+    @staticmethod
+    def compact_payload(word_meta: dict) -> dict:
+        return {
+            'meta': {'syns': word_meta['meta'].get('syns') or []},
+            'shortdef': word_meta.get('shortdef'),
+        }
 
     @classmethod
     def get_meaning(cls, meta: dict) -> str:
@@ -141,4 +566,158 @@ class OxfordApi:
 
     @classmethod
     def get_synonyms(cls, meta: dict) -> list[str]:
-        return meta['meta']['syns'][0] if meta['meta']['syns'] else []
\ No newline at end of file
+        return meta['meta']['syns'][0] if meta['meta']['syns'] else []
+
+
+class LexemeLookup(t.NamedTuple):
+    lexeme_ids: dict[str, int]
+    words_meta: dict[str, dict | None]
+
+    def is_found(self, title: str) -> bool:
+        key = OxfordApi.normalize_title(title)
+        return key in self.lexeme_ids or bool(self.words_meta.get(key))
+
+
+class Lexicon:
+    """Resolves titles to shared lexemes, the dictionary is only asked about titles without one."""
+
+    @staticmethod
+    async def lookup(titles: t.Iterable[str]) -> LexemeLookup:
+        keys = list(dict.fromkeys(OxfordApi.normalize_title(title) for title in titles))
+
+        session = get_async_session()
+        async with AsyncSqlAlchemyUnitOfWork(session):
+            lexeme_ids = await lesson_repo.LexemeRepository(session).get_ids(keys)
+
+        words_meta = await OxfordApi.parse_words_from_api(key for key in keys if key not in lexeme_ids)
+        return LexemeLookup(lexeme_ids, words_meta)
+
+    @staticmethod
+    async def save(session: AsyncSession, lookup: LexemeLookup) -> dict[str, int]:
+        """Creates the missing lexemes in the caller's transaction and returns lexeme ids by normalized title."""
+
+        lexemes = [
+            {
+                'title': key,
+                'meaning': OxfordApi.get_meaning(word_meta),
+                'synonyms': OxfordApi.get_synonyms(word_meta)
+            } for key, word_meta in lookup.words_meta.items() if word_meta
+        ]
+        created = await lesson_repo.LexemeRepository(session).create_many(lexemes)
+
+        synonym_graph.add_after_commit(session, [
+            (created[lexeme['title']], lexeme['title'], lexeme['synonyms']) for lexeme in lexemes
+        ])
+        return {**lookup.lexeme_ids, **created}
+
+
+class UnitWordsImporter:
+
+    @classmethod
+    async def import_batch(
+        cls,
+        session: AsyncSession,
+        unit_id: int,
+        words: list[CsvFileColumns]
+    ) -> list[CsvFileColumns]:
+        """Saves the words known to the dictionary and returns the unknown ones."""
+
+        lookup = await Lexicon.lookup(one_word.title for one_word in words)
+        found = [one_word for one_word in words if lookup.is_found(one_word.title)]
+
+        if found:
+            async with AsyncSqlAlchemyUnitOfWork(session):
+                await cls.save(session, unit_id, found, lookup)
+
+        return [one_word for one_word in words if not lookup.is_found(one_word.title)]
+
+    @staticmethod
+    async def save(
+        session: AsyncSession,
+        unit_id: int,
+        found: list[CsvFileColumns],
+        lookup: LexemeLookup
+    ) -> None:
+        """Inserts the words in the caller's transaction."""
+
+        if not found:
+            return
+
+        lexeme_ids = await Lexicon.save(session, lookup)
+
+        await lesson_repo.WordRepository(session).bulk_create([
+            {
+                'title': one_word.title,
+                'unit_id': unit_id,
+                'topic': one_word.topic,
+                'lexeme_id': lexeme_ids[OxfordApi.normalize_title(one_word.title)]
+            } for one_word in found
+        ])
+
+        await UnitWordsCounter.apply(session, unit_id, added=[one_word.title for one_word in found])
+        await lesson_repo.UnitRepository(session).bump_version(unit_id)
+
+
+class ListingResponse:
+    """Builds list responses either through the Pydantic schemas or, with FAST_JSON_RESPONSES, straight from dicts."""
+
+    @staticmethod
+    def build(schema: type[pydantic.BaseModel], rows: list[dict]) -> list[pydantic.BaseModel] | ORJSONResponse:
+        if Config.FAST_JSON_RESPONSES:
+            # Skips building a model per row and FastAPI validating it again through response_model
+            return ORJSONResponse(rows)
+
+        return [schema(**row) for row in rows]
+
+    @staticmethod
+    def dump(adapter: pydantic.TypeAdapter, rows: list[dict]) -> bytes:
+        if Config.FAST_JSON_RESPONSES:
+            return orjson.dumps(rows)
+
+        return adapter.dump_json(adapter.validate_python(rows))
+
+
+class UnitWordsListCache:
+    """Serialized word lists keyed by the unit version, which every word write bumps."""
+
+    cache = TTLCache(Config.WORD_LIST_CACHE_SIZE, Config.WORD_LIST_CACHE_TTL)
+    serializer = pydantic.TypeAdapter(list[WordForListingResponse])
+
+    @staticmethod
+    def etag(unit_id: int, version: int, query: dict) -> str:
+        query_hash = hashlib.sha1(repr(sorted(query.items())).encode()).hexdigest()[:16]
+        return f'"{unit_id}-{version}-{query_hash}"'
+
+    @staticmethod
+    def etag_matches(if_none_match: str | None, etag: str) -> bool:
+        if not if_none_match:
+            return False
+
+        candidates = {candidate.strip().removeprefix('W/') for candidate in if_none_match.split(',')}
+        return '*' in candidates or etag in candidates
+
+    @classmethod
+    def get(cls, etag: str) -> bytes | None:
+        return cls.cache.get(etag)
+
+    @classmethod
+    def set(cls, etag: str, words: t.Sequence[Word]) -> bytes:
+        body = ListingResponse.dump(cls.serializer, [
+            {
+                'id': word.id,
+                'title': word.title,
+                'translation': word.meaning,
+                'topic': word.topic,
+                'is_completed': word.completed
+            } for word in words
+        ])
+        cls.cache.set(etag, body)
+        return body
+
+
+DICTIONARY_API_CONNECTIONS = Gauge(
+    'dictionary_api_connections',
+    'Sockets held by the shared vocabulary API client',
+    ('state',),
+    callback=OxfordApi.connections_stats
+)